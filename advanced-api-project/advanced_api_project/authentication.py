@@ -0,0 +1,48 @@
+"""
+TokenAuthentication for the book write endpoints, with validated tokens
+kept in the "tokens" cache (see CACHES in settings).
+
+A warm token authenticates without touching the token table. The alias's
+TIMEOUT and MAX_ENTRIES bound how long and how many tokens are kept; a
+shared backend lets every worker use the same entries. Saving or deleting
+a token or its user drops the entry. ``stats`` counts hits and misses.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+stats = Counter()
+
+
+def token_cache():
+    return caches["tokens"]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        entry = cache.get(f"token:{key}")
+        stats["hits" if entry is not None else "misses"] += 1
+        if entry is None:
+            entry = super().authenticate_credentials(key)
+            cache.set_many({f"token:{key}": entry, f"user:{entry[0].pk}": key})
+        return entry
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache().delete_many([f"token:{instance.key}", f"user:{instance.user_id}"])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_user_token(sender, instance, **kwargs):
+    key = token_cache().get(f"user:{instance.pk}")
+    if key is not None:
+        token_cache().delete_many([f"token:{key}", f"user:{instance.pk}"])
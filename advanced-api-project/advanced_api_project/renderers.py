@@ -0,0 +1,23 @@
+"""
+orjson-backed JSON renderer: same compact UTF-8 output as DRF's
+JSONRenderer, encoded in C. Falls back to JSONRenderer without orjson.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        option = orjson.OPT_NON_STR_KEYS
+        # ?indent= (or an indent in Accept) asks for readable output; orjson only indents by two
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        # Dates, decimals and lazy strings go through DRF's encoder
+        return orjson.dumps(data, default=JSONEncoder().default, option=option)
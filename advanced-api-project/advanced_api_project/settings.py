@@ -129,11 +129,36 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #Tocken Auth
 REST_FRAMEWORK={
     'DEFAULT_AUTHENTICATION_CLASSES':[
-        "rest_framework.authentication.TokenAuthentication"
+        # TokenAuthentication with a cache in front of the token table
+        "advanced_api_project.authentication.CachedTokenAuthentication"
     ],
     'DEFAULT_FILTER_BACKENDS':[
         "django_filters.rest_framework.DjangoFilterBackend",
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
-    ]
+    ],
+    # orjson-backed JSON first (advanced_api_project/renderers.py)
+    'DEFAULT_RENDERER_CLASSES':[
+        "advanced_api_project.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
+
+# Caches. "tokens" holds validated API tokens for TIMEOUT seconds
+# (advanced_api_project/authentication.py); use a shared backend such as
+# Redis to share them between processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "tokens": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tokens",
+        "TIMEOUT": 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Response cache (advanced_api_project/response_cache.py): seconds a rendered
+# book list/detail stays cached; model signals invalidate it sooner. 0 turns it off
+RESPONSE_CACHE_TIMEOUT = 60
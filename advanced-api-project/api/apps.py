@@ -1,6 +1,37 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+# The migration that adds Book.author_name and first builds the search index
+INDEX_MIGRATION = "0003_book_author_name_indexes"
+
+
+def install_book_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+
+    from .search import install_index
+
+    connection = connections[using]
+    # Before 0003 (or after unapplying it) api_book has no author_name to index
+    if (sender.label, INDEX_MIGRATION) in MigrationRecorder(connection).applied_migrations():
+        install_index(connection)
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # A migration that rebuilds api_book on SQLite loses the search
+        # triggers along with the old table; put them back after migrate
+        post_migrate.connect(install_book_search_index, sender=self)
+
+        # Connects the token cache's invalidation receivers in every process,
+        # not only once DRF first loads the authentication class
+        from advanced_api_project import authentication  # noqa: F401
+        from advanced_api_project.response_cache import bump_on_write
+
+        # Any book or author write retires the cached book responses
+        for model in (self.get_model("Book"), self.get_model("Author")):
+            post_save.connect(bump_on_write, sender=model, dispatch_uid=f"response-cache:{model.__name__}")
+            post_delete.connect(bump_on_write, sender=model, dispatch_uid=f"response-cache:{model.__name__}")
@@ -0,0 +1,266 @@
+"""
+Bulk import and streaming export of books.
+
+Imports read CSV or NDJSON records lazily, so a 500k-row catalog is never
+held in memory, and process them in batches:
+
+1. every row of the batch is validated in Python (title, publication_year);
+2. authors are resolved with one query per batch into a name/id lookup
+   dict that is kept for the whole import; unknown author names are
+   created with one bulk_create;
+3. the valid books are written with one bulk_create, inside a transaction
+   per batch.
+
+Rows that fail are reported with their line number and field errors; they
+never abort the rest of the import. Lines that cannot be read at all (not
+UTF-8, bad JSON, broken CSV) are counted as ``malformed`` as well.
+
+Each record has a ``title``, a ``publication_year`` and either ``author``
+(an existing Author id) or ``author_name``.
+"""
+import csv
+import json
+from collections import namedtuple
+from datetime import date
+
+from django.db import transaction
+
+from advanced_api_project.response_cache import bump
+
+from .models import Author, Book
+
+FORMATS = ("csv", "ndjson")
+EXPORT_FIELDS = ("id", "title", "publication_year", "author", "author_name")
+
+ImportResult = namedtuple("ImportResult", ["created", "authors_created", "errors", "error_count", "malformed"])
+
+
+class RecordError(ValueError):
+    """A record that could not be parsed at all (bad JSON, not an object...)."""
+
+
+def decode_lines(lines):
+    """
+    Text lines from an iterable of UTF-8 byte lines (a leading BOM is
+    dropped). A line that does not decode becomes a RecordError in its place.
+    """
+    for line in lines:
+        try:
+            yield line.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            yield RecordError("Line is not valid UTF-8.")
+
+
+def _read_csv(lines):
+    unreadable = []
+
+    def text():
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, RecordError):
+                unreadable.append((number, line))
+                line = "\n"  # a blank line keeps reader.line_num in step
+            yield line
+
+    reader = csv.DictReader(text())
+    try:
+        for record in reader:
+            yield from unreadable
+            unreadable.clear()
+            yield reader.line_num, record
+    except csv.Error as exc:
+        # The reader cannot resync after a malformed line; report it and stop
+        unreadable.append((reader.line_num, RecordError(f"Invalid CSV: {exc}")))
+    yield from unreadable
+
+
+def read_records(lines, fmt):
+    """
+    Yield ``(line_number, record_dict)`` from an iterable of text lines
+    (or RecordErrors from decode_lines()). Unparseable records are yielded
+    as ``(line_number, RecordError)``.
+    """
+    if fmt == "csv":
+        yield from _read_csv(lines)
+    elif fmt == "ndjson":
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, RecordError):
+                yield number, line
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield number, RecordError(f"Invalid JSON: {exc}")
+                continue
+            if not isinstance(record, dict):
+                yield number, RecordError("Each line must be a JSON object.")
+                continue
+            yield number, record
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+
+
+def _clean_int(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    return int(str(value).strip())
+
+
+def validate_record(record, max_year):
+    """
+    Field-level validation without touching the database. Returns
+    ``(values, errors)``; author ids and names are resolved per batch later.
+    """
+    errors = {}
+    values = {}
+
+    title = str(record.get("title") or "").strip()
+    max_length = Book._meta.get_field("title").max_length
+    if not title:
+        errors["title"] = ["This field is required."]
+    elif len(title) > max_length:
+        errors["title"] = [f"Ensure this field has no more than {max_length} characters."]
+    values["title"] = title
+
+    try:
+        year = _clean_int(record.get("publication_year"))
+    except (TypeError, ValueError):
+        errors["publication_year"] = ["A valid integer is required."]
+    else:
+        if year > max_year:
+            errors["publication_year"] = ["Publication year cannot be in the future."]
+        values["publication_year"] = year
+
+    author, author_name = record.get("author"), str(record.get("author_name") or "").strip()
+    if author not in (None, ""):
+        try:
+            values["author_id"] = _clean_int(author)
+        except (TypeError, ValueError):
+            errors["author"] = ["A valid author id is required."]
+    elif author_name:
+        if len(author_name) > Author._meta.get_field("name").max_length:
+            errors["author_name"] = ["Author name is too long."]
+        values["author_name"] = author_name
+    else:
+        errors["author"] = ["Either author or author_name is required."]
+    return values, errors
+
+
+class BookImporter:
+    def __init__(self, batch_size=1000, create_authors=True, max_errors=1000):
+        self.batch_size = batch_size
+        self.create_authors = create_authors
+        self.max_errors = max_errors
+        self.max_year = date.today().year
+        # Resolved across the whole import: author name -> id, and id -> name
+        self.author_ids_by_name = {}
+        self.author_names_by_id = {}
+        self.created = 0
+        self.authors_created = 0
+        self.errors = []
+        self.error_count = 0
+        self.malformed = 0
+
+    def run(self, records):
+        batch = []
+        for number, record in records:
+            batch.append((number, record))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return ImportResult(self.created, self.authors_created, self.errors, self.error_count, self.malformed)
+
+    def add_error(self, number, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": number, "errors": errors})
+
+    def resolve_authors(self, rows):
+        """Fill the lookup dicts for every author id and name in ``rows`` (one query each)."""
+        ids = {values["author_id"] for _, values in rows if "author_id" in values} - set(self.author_names_by_id)
+        if ids:
+            self.author_names_by_id.update(Author.objects.filter(pk__in=ids).values_list("pk", "name"))
+
+        names = {values["author_name"] for _, values in rows if "author_name" in values} - set(self.author_ids_by_name)
+        if not names:
+            return
+        # Author names are not unique; the oldest author with a name wins
+        for pk, name in Author.objects.filter(name__in=names).order_by("-pk").values_list("pk", "name"):
+            self.author_ids_by_name[name] = pk
+        missing = sorted(names - set(self.author_ids_by_name))
+        if missing and self.create_authors:
+            for author in Author.objects.bulk_create([Author(name=name) for name in missing]):
+                self.author_ids_by_name[author.name] = author.pk
+            self.authors_created += len(missing)
+
+    def import_batch(self, batch):
+        rows = []
+        for number, record in batch:
+            if isinstance(record, RecordError):
+                self.malformed += 1
+                self.add_error(number, {"non_field_errors": [str(record)]})
+                continue
+            values, errors = validate_record(record, self.max_year)
+            if errors:
+                self.add_error(number, errors)
+            else:
+                rows.append((number, values))
+
+        with transaction.atomic():
+            self.resolve_authors(rows)
+            books = []
+            for number, values in rows:
+                if "author_name" in values:
+                    author_name = values["author_name"]
+                    author_id = self.author_ids_by_name.get(author_name)
+                    if author_id is None:
+                        self.add_error(number, {"author_name": ["No author with this name."]})
+                        continue
+                else:
+                    author_id = values["author_id"]
+                    author_name = self.author_names_by_id.get(author_id)
+                    if author_name is None:
+                        self.add_error(number, {"author": [f"Invalid pk \"{author_id}\" - object does not exist."]})
+                        continue
+                books.append(Book(
+                    title=values["title"],
+                    publication_year=values["publication_year"],
+                    author_id=author_id,
+                    author_name=author_name,
+                ))
+            Book.objects.bulk_create(books)
+        self.created += len(books)
+        # bulk_create() sends no post_save; invalidate cached book responses
+        bump()
+
+
+def export_rows(queryset=None, chunk_size=2000):
+    """Yield book dicts in EXPORT_FIELDS order, streaming from the database in chunks."""
+    queryset = Book.objects.all() if queryset is None else queryset
+    rows = queryset.order_by("pk").values_list("pk", "title", "publication_year", "author_id", "author_name")
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def export_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bulk import FORMATS, BookImporter, decode_lines, read_records
+
+
+class Command(BaseCommand):
+    help = "Bulk import books from a CSV or NDJSON file (see api.bulk for the record format)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-create-authors", action="store_true",
+            help="Reject rows whose author_name does not exist instead of creating the author.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(path.suffix)
+        if fmt is None:
+            raise CommandError("Cannot tell the format from the extension; pass --format.")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        importer = BookImporter(batch_size=options["batch_size"], create_authors=not options["no_create_authors"])
+        with path.open("rb") as lines:
+            result = importer.run(read_records(decode_lines(lines), fmt))
+
+        for error in result.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.created} books and {result.authors_created} authors; "
+            f"rejected {result.error_count} rows."
+        ))
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_author_names(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+    Book = apps.get_model('api', 'Book')
+    Book.objects.update(author_name=Subquery(Author.objects.filter(pk=OuterRef('author_id')).values('name')[:1]))
+
+
+# The search index as this migration creates it, frozen here so later
+# changes to api.search cannot change what it does. api.apps re-installs
+# the current definition after every migrate.
+INSTALL_SEARCH_INDEX = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS api_book_search USING fts5("
+        "title, author_name, content='api_book', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS api_book_search_ai AFTER INSERT ON api_book BEGIN "
+        "INSERT INTO api_book_search(rowid, title, author_name) VALUES (new.id, new.title, new.author_name); END",
+        "CREATE TRIGGER IF NOT EXISTS api_book_search_ad AFTER DELETE ON api_book BEGIN "
+        "INSERT INTO api_book_search(api_book_search, rowid, title, author_name) "
+        "VALUES ('delete', old.id, old.title, old.author_name); END",
+        "CREATE TRIGGER IF NOT EXISTS api_book_search_au AFTER UPDATE OF title, author_name ON api_book BEGIN "
+        "INSERT INTO api_book_search(api_book_search, rowid, title, author_name) "
+        "VALUES ('delete', old.id, old.title, old.author_name); "
+        "INSERT INTO api_book_search(rowid, title, author_name) VALUES (new.id, new.title, new.author_name); END",
+        "INSERT INTO api_book_search(api_book_search) VALUES ('rebuild')",
+    ],
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS api_book_title_trgm_idx ON api_book USING gin (UPPER(title) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS api_book_author_name_trgm_idx ON api_book "
+        "USING gin (UPPER(author_name) gin_trgm_ops)",
+    ],
+}
+
+DROP_SEARCH_INDEX = {
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS api_book_search_ai",
+        "DROP TRIGGER IF EXISTS api_book_search_ad",
+        "DROP TRIGGER IF EXISTS api_book_search_au",
+        "DROP TABLE IF EXISTS api_book_search",
+    ],
+    'postgresql': [
+        "DROP INDEX IF EXISTS api_book_title_trgm_idx",
+        "DROP INDEX IF EXISTS api_book_author_name_trgm_idx",
+    ],
+}
+
+
+def install_search_index(apps, schema_editor):
+    for sql in INSTALL_SEARCH_INDEX.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_SEARCH_INDEX.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='author_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='books', to='api.author'),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name', 'id'], name='author_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='book_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year', 'title'], name='book_year_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title'], name='book_author_title_idx'),
+        ),
+        migrations.RunPython(copy_author_names, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -1,29 +1,115 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from datetime import date
+from advanced_api_project.response_cache import bump
 # Create your models here.
 #Author model: Represents a writer who may have multiple books
 class Author(models.Model):
     name=models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [models.Index(fields=['name', 'id'], name='author_name_idx')]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        # Keep the copy on Book.author_name in step (queryset.update() skips
+        # this), and move updated_at on so the books' ETags change with it
+        if not adding:
+            self.books.exclude(author_name=self.name).update(author_name=self.name, updated_at=timezone.now())
     
     def __str__(self):
         return f"{self.name}"
     
 
+class BookQuerySet(models.QuerySet):
+    def validated_bulk_create(self, books, batch_size=None):
+        """
+        bulk_create() after Book.validate_many(): all books or none. Raises
+        ValidationError keyed by the index of each invalid book.
+        """
+        errors = self.model.validate_many(books)
+        if errors:
+            raise ValidationError({index: error.messages for index, error in errors.items()})
+        created = self.bulk_create(books, batch_size=batch_size)
+        # bulk_create() sends no post_save; invalidate cached book responses
+        bump()
+        return created
+
+
 # Book model: Represents a book linked to an author
 class Book(models.Model):
     title=models.CharField(max_length=100)
     publication_year=models.IntegerField()
-    author=models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books') # Reverse lookup: author.books.all()
-    
+    # Reverse lookup: author.books.all(); indexed by the composite author indexes below
+    author=models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books', db_index=False)
+    # Copy of author.name, so BookListView can search it without joining api_author
+    author_name=models.CharField(max_length=100, editable=False, blank=True, default='')
+    updated_at=models.DateTimeField(auto_now=True) # ETag/Last-Modified validator for BookDetailView
+
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        # One index per BookListView filter, each followed by its ordering
+        # column so ?ordering= is read in index order instead of sorted
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_idx'),
+            models.Index(fields=['publication_year', 'title'], name='book_year_title_idx'),
+            models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+            models.Index(fields=['author', 'title'], name='book_author_title_idx'),
+        ]
+
     def clean(self):
         current_year=date.today().year
-        if self.publication_year > current_year:
+        if self.publication_year is not None and self.publication_year > current_year:
             raise ValidationError("Publication year cannot be in the future.")
-        
-    def save(self, *args, **kwargs):
-        self.full_clean() # runs all model validations before saving
+
+    def save(self, *args, full_clean=False, **kwargs):
+        """
+        Runs clean() (no queries) before writing. full_clean=True also
+        re-validates every field and checks the author exists, which costs
+        a query; data from BookSerializer has already been through both.
+        """
+        if full_clean:
+            self.full_clean() # runs all model validations before saving
+        else:
+            self.clean()
+        # Free when the author is already loaded (serializer saves); one query otherwise
+        self.author_name = self.author.name
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'author' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'author_name'}
         super().save(*args, **kwargs) #writes to DB
+
+    @classmethod
+    def validate_many(cls, books):
+        """
+        Validate many unsaved books with one author-existence query in total,
+        instead of full_clean()'s query per book, and fill in author_name from
+        the same query. Returns {index: ValidationError}.
+        """
+        author_ids = {book.author_id for book in books if book.author_id is not None}
+        existing = dict(Author.objects.filter(pk__in=author_ids).values_list('pk', 'name'))
+        errors = {}
+        for index, book in enumerate(books):
+            messages = {}
+            try:
+                # The FK check is the per-book query; it is done in bulk above
+                book.clean_fields(exclude=['author'])
+            except ValidationError as exc:
+                messages.update(exc.message_dict)
+            try:
+                book.clean()
+            except ValidationError as exc:
+                messages.setdefault('__all__', []).extend(exc.messages)
+            if book.author_id in existing:
+                book.author_name = existing[book.author_id]
+            else:
+                messages['author'] = [f'Author with id {book.author_id} does not exist.']
+            if messages:
+                errors[index] = ValidationError(messages)
+        return errors
     
     def __str__(self):
         return f"{self.title} published in {self.publication_year} by {self.author}"
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Indexed ``?search=`` for BookListView, over the book title and the
+denormalized ``Book.author_name`` (so no JOIN to api_author).
+
+On SQLite the two columns are mirrored into ``api_book_search``, an FTS5
+table with the trigram tokenizer, kept in step with api_book by triggers.
+A trigram match is a case-insensitive substring match, the same answer
+``icontains`` gives, but read from the index. On PostgreSQL, pg_trgm GIN
+indexes serve the ``icontains`` lookups Django already emits. Other
+databases, and terms shorter than a trigram, use plain ``icontains``.
+
+Migration 0003 creates the index from its own copy of this DDL;
+``install_index()`` re-creates it after every ``migrate`` (see
+``api.apps``), since SQLite drops the triggers whenever a migration
+rebuilds api_book.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Terms beyond this are ignored rather than producing an unbounded query
+MAX_TERMS = 8
+# Shortest term a trigram index can answer
+MIN_TRIGRAM_LENGTH = 3
+
+FTS_TABLE = "api_book_search"
+# pg_trgm index name -> column; icontains compiles to UPPER(col) LIKE UPPER(%s)
+TRIGRAM_INDEXES = {
+    "api_book_title_trgm_idx": "title",
+    "api_book_author_name_trgm_idx": "author_name",
+}
+
+
+def search_terms(text):
+    """Split ``?search=`` the way SearchFilter does: on whitespace and commas."""
+    return [term for term in re.split(r"[\s,]+", text.strip()) if term][:MAX_TERMS]
+
+
+def search_books(queryset, text):
+    """Books in ``queryset`` whose title or author name contains every term of ``text``."""
+    fts_terms = []
+    use_fts = connections[queryset.db].vendor == "sqlite"
+    for term in search_terms(text):
+        if use_fts and len(term) >= MIN_TRIGRAM_LENGTH:
+            fts_terms.append(term)
+        else:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(author_name__icontains=term))
+    if fts_terms:
+        # Quoted FTS5 strings, implicitly ANDed
+        match = " ".join('"%s"' % term.replace('"', '""') for term in fts_terms)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+    return queryset
+
+
+def install_index(connection, rebuild=False):
+    """Create the database's search index if it is missing; ``rebuild`` re-indexes every book."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "title, author_name, content='api_book', content_rowid='id', tokenize='trigram')"
+            )
+            insert = f"INSERT INTO {FTS_TABLE}(rowid, title, author_name) VALUES (new.id, new.title, new.author_name);"
+            delete = (
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author_name) "
+                "VALUES ('delete', old.id, old.title, old.author_name);"
+            )
+            triggers = {
+                "ai": ("AFTER INSERT", insert),
+                "ad": ("AFTER DELETE", delete),
+                "au": ("AFTER UPDATE OF title, author_name", delete + " " + insert),
+            }
+            for suffix, (event, body) in triggers.items():
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{suffix} {event} ON api_book BEGIN {body} END"
+                )
+            if rebuild:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for name, column in TRIGRAM_INDEXES.items():
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON api_book USING gin (UPPER({column}) gin_trgm_ops)"
+                )
+
+
+def drop_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == "postgresql":
+            for name in TRIGRAM_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
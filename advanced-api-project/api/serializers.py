@@ -2,7 +2,7 @@ from .models import Author, Book
 from rest_framework import serializers
 from datetime import date
 
-# Serializer for Book     
+# Serializer for Book; BookListView feeds it .values() rows (values_representation)
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model=Book
@@ -14,14 +14,25 @@ class BookSerializer(serializers.ModelSerializer):
         if value > current_year:
             raise serializers.ValidationError("Publication year cannot be in the future.")
         return value
+
+    def values_representation(self, rows):
+        """
+        What .data gives for the same books, from Book.objects.values(*self.fields)
+        rows. Every column is already JSON-ready except updated_at.
+        """
+        updated_at = self.fields['updated_at'].to_representation
+        return [{**row, 'updated_at': updated_at(row['updated_at'])} for row in rows]
     
 # Serializer for Author
 class AuthorSerializer(serializers.ModelSerializer):
-    # Pull related books from the `related_name='books'` in the model
-    books = BookSerializer(many=True, read_only=True)
+    # Related books (`related_name='books'` in the model), capped per author.
+    # Expects a queryset from api.views.authors_with_books(): newest_books
+    # prefetched and books_count annotated, so no query per author
+    books = BookSerializer(many=True, read_only=True, source='newest_books')
+    books_count = serializers.IntegerField(read_only=True)
     class Meta:
         model=Author
-        fields=('name',)
+        fields=('id', 'name', 'books_count', 'books')
         
     #Validate that user passed a name
     def validate_name(self, value):
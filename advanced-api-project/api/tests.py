@@ -1,3 +1,359 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from advanced_api_project.authentication import stats, token_cache
+from .models import Author, Book
+from .serializers import BookSerializer
+
+
+class BookConditionalGetTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="John Doe")
+        self.book = Book.objects.create(title="Sample Book", publication_year=2001, author=self.author)
+        self.client = APIClient()
+        self.url = reverse("book-detail", args=[self.book.id])
+
+    def test_revalidation_returns_304_from_one_lookup(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        since = response["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+
+    def test_update_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.book.title = "Second Edition"
+        self.book.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["title"], "Second Edition")
+
+    def test_author_rename_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.author.name = "Jane Doe"
+        self.author.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["author_name"], "Jane Doe")
+
+    def test_missing_book_is_404(self):
+        self.assertEqual(self.client.get(reverse("book-detail", args=[999])).status_code, 404)
+
+
+class BookValidationTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="John Doe")
+
+    def test_save_skips_author_query_unless_full_clean(self):
+        with self.assertNumQueries(1):
+            Book(title="Fast", publication_year=2001, author=self.author).save()
+        with self.assertNumQueries(2):
+            Book(title="Checked", publication_year=2001, author=self.author).save(full_clean=True)
+
+    def test_save_still_rejects_future_year(self):
+        with self.assertRaises(ValidationError):
+            Book(title="Future", publication_year=3000, author=self.author).save()
+        with self.assertRaises(ValidationError) as ctx:
+            Book(title="", publication_year=None, author=self.author).save(full_clean=True)
+        self.assertEqual(set(ctx.exception.message_dict), {"title", "publication_year"})
+
+    def test_api_create_is_one_insert(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="writer", password="pass1234"))
+        data = {"title": "Dune", "publication_year": 1965, "author": self.author.id}
+        # author lookup by the serializer field, INSERT
+        with self.assertNumQueries(2):
+            response = client.post(reverse("book-create"), data)
+        self.assertEqual(response.status_code, 201)
+
+    def test_validated_bulk_create_checks_authors_once(self):
+        books = [Book(title=f"Book {i}", publication_year=2000, author=self.author) for i in range(50)]
+        with self.assertNumQueries(2):
+            Book.objects.validated_bulk_create(books)
+        self.assertEqual(self.author.books.count(), 50)
+
+    def test_validated_bulk_create_is_all_or_nothing(self):
+        books = [
+            Book(title="Good", publication_year=2000, author=self.author),
+            Book(title="Future", publication_year=3000, author=self.author),
+            Book(title="Orphan", publication_year=2000, author_id=999),
+        ]
+        with self.assertRaises(ValidationError) as ctx:
+            Book.objects.validated_bulk_create(books)
+        self.assertEqual(set(ctx.exception.message_dict), {1, 2})
+        self.assertFalse(Book.objects.exists())
+
+
+class AuthorNestedBooksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        authors = Author.objects.bulk_create([Author(name=f"Author {i:04d}") for i in range(1000)])
+        Book.objects.bulk_create([
+            Book(title=f"Book {i}-{n}", publication_year=1900 + n, author=author)
+            for i, author in enumerate(authors)
+            for n in range(i % 8)
+        ])
+        cls.author = authors[7]  # seven books
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_of_1000_authors_is_two_queries(self):
+        # authors with books_count, then the capped books for all of them
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("author-list"))
+        self.assertEqual(len(response.data), 1000)
+        row = next(a for a in response.data if a["id"] == self.author.id)
+        self.assertEqual(row["books_count"], 7)
+        self.assertEqual([b["publication_year"] for b in row["books"]], [1906, 1905, 1904, 1903, 1902])
+
+    def test_books_limit(self):
+        url = reverse("author-detail", args=[self.author.id])
+        self.assertEqual(len(self.client.get(url, {"books_limit": 2}).data["books"]), 2)
+        self.assertEqual(len(self.client.get(url, {"books_limit": 500}).data["books"]), 7)
+        self.assertEqual(len(self.client.get(url, {"books_limit": "x"}).data["books"]), 5)
+        response = self.client.get(url, {"books_limit": 0})
+        self.assertEqual((response.data["books"], response.data["books_count"]), ([], 7))
+
+
+class BookListQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(name="Frank Herbert")
+        Book.objects.create(title="Dune", publication_year=1965, author=cls.author)
+        Book.objects.create(title="Children of Dune", publication_year=1976, author=cls.author)
+
+    def query_plans(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(reverse("book-list"), params)
+        self.assertEqual(response.status_code, 200)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.extend(row[-1] for row in cursor.fetchall())
+        return response, plans
+
+    # Every request must reach the database for its plan to be checked
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_filters_and_search_use_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite's")
+        cases = [
+            {"title": "Dune"},
+            {"author": self.author.id},
+            {"publication_year": 1965},
+            {"author": self.author.id, "publication_year": 1965},
+            {"publication_year": 1965, "ordering": "title"},
+            {"author": self.author.id, "ordering": "-publication_year"},
+            {"author": self.author.id, "ordering": "title"},
+            {"search": "herb"},
+            {"search": "dune HERBERT"},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                response, plans = self.query_plans(params)
+                self.assertTrue(response.data)
+                for line in plans:
+                    # Virtual-table (FTS) scans are index lookups; a bare table scan is not
+                    if line.startswith("SCAN ") and "VIRTUAL TABLE" not in line:
+                        self.fail(f"full scan for {params}: {plans}")
+                    self.assertNotIn("TEMP B-TREE", line, f"sort for {params}: {plans}")
+
+    def search(self, text):
+        return sorted(book["title"] for book in APIClient().get(reverse("book-list"), {"search": text}).data)
+
+    def test_search_matches_substrings_of_title_and_author(self):
+        search = self.search
+        self.assertEqual(search("une"), ["Children of Dune", "Dune"])
+        self.assertEqual(search("child herbert"), ["Children of Dune"])
+        self.assertEqual(search("of"), ["Children of Dune"])  # too short for trigrams: LIKE fallback
+        self.assertEqual(search("asimov"), [])
+
+    def test_author_rename_updates_books(self):
+        self.author.name = "F. Herbert"
+        self.author.save()
+        self.assertEqual(set(Book.objects.values_list("author_name", flat=True)), {"F. Herbert"})
+        self.assertEqual(len(APIClient().get(reverse("book-list"), {"search": "F. Herb"}).data), 2)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache().clear()
+        stats.clear()
+        self.user = get_user_model().objects.create_user(username="writer", password="pass1234")
+        self.token = Token.objects.create(user=self.user)
+        self.author = Author.objects.create(name="Frank Herbert")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def create(self, title):
+        data = {"title": title, "publication_year": 1965, "author": self.author.id}
+        return self.client.post(reverse("book-create"), data)
+
+    def test_warm_token_skips_token_query(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.assertEqual(self.create("Dune").status_code, 201)
+        with CaptureQueriesContext(connection) as warm:
+            self.assertEqual(self.create("Dune Messiah").status_code, 201)
+        self.assertEqual(len(warm.captured_queries), len(cold.captured_queries) - 1)
+        self.assertEqual(stats, {"misses": 1, "hits": 1})
+
+    def test_revoked_token_and_inactive_user_are_rejected(self):
+        self.create("Dune")
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.create("Dune Messiah").status_code, 401)
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.create("Dune Messiah").status_code, 201)
+        self.token.delete()
+        self.assertEqual(self.create("Children of Dune").status_code, 401)
+
+
+class BookResponseCacheTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Frank Herbert")
+        self.book = Book.objects.create(title="Dune", publication_year=1965, author=self.author)
+        self.client = APIClient()
+
+    def test_list_is_cached_until_books_or_authors_change(self):
+        url = reverse("book-list")
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        self.author.name = "F. Herbert"
+        self.author.save()
+        response = self.client.get(url)
+        self.assertEqual((response["X-Cache"], response.data[0]["author_name"]), ("MISS", "F. Herbert"))
+
+        # bulk_create() sends no signals; the bulk path invalidates explicitly
+        Book.objects.validated_bulk_create([Book(title="Children of Dune", publication_year=1976, author=self.author)])
+        self.assertEqual(len(self.client.get(url).data), 2)
+
+    def test_detail_keeps_conditional_get(self):
+        url = reverse("book-detail", args=[self.book.id])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url)
+        self.assertEqual((response["X-Cache"], response["ETag"]), ("HIT", etag))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class BookListValuesPathTests(TestCase):
+    def setUp(self):
+        author = Author.objects.create(name="Frank Herbert")
+        for year in (1965, 1969, 1976):
+            Book.objects.create(title=f"Dune {year}", publication_year=year, author=author)
+        self.client = APIClient()
+
+    def test_list_matches_serializer(self):
+        response = self.client.get(reverse("book-list"), {"ordering": "-publication_year", "search": "herbert"})
+        self.assertEqual(response["Content-Type"], "application/json")
+        expected = BookSerializer(Book.objects.order_by("-publication_year"), many=True).data
+        self.assertEqual(response.data, expected)
+        self.assertEqual(json.loads(response.content), json.loads(json.dumps(expected)))
+
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="loader", password="pass1234")
+        self.existing = Author.objects.create(name="Existing Author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post_body(self, body, content_type):
+        return self.client.generic("POST", reverse("book-import"), body.encode(), content_type=content_type)
+
+    def test_csv_import_reports_row_errors(self):
+        body = (
+            "title,publication_year,author,author_name\n"
+            f"Dune,1965,{self.existing.id},\n"
+            "Neuromancer,1984,,William Gibson\n"
+            "Count Zero,1986,,William Gibson\n"
+            ",1990,,Nobody\n"
+            "Future,3000,,Someone\n"
+            "Ghost,2000,99999,\n"
+        )
+        response = self.post_body(body, "text/csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["authors_created"], 1)
+        self.assertEqual(
+            [(e["row"], sorted(e["errors"])) for e in response.data["errors"]],
+            [(5, ["title"]), (6, ["publication_year"]), (7, ["author"])],
+        )
+        self.assertEqual(Author.objects.get(name="William Gibson").books.count(), 2)
+
+    def test_ndjson_import_resolves_authors_once_per_batch(self):
+        lines = [json.dumps({"title": f"Book {i}", "publication_year": 2000, "author_name": f"Author {i % 3}"})
+                 for i in range(30)]
+        lines.insert(3, "not json")
+        # Per batch: author name lookup, author insert, book insert, and the transaction
+        with self.assertNumQueries(5):
+            response = self.post_body("\n".join(lines) + "\n", "application/x-ndjson")
+        self.assertEqual(response.data["created"], 30)
+        self.assertEqual(response.data["errors"], [{"row": 4, "errors": {"non_field_errors": [
+            "Invalid JSON: Expecting value: line 1 column 1 (char 0)"]}}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["malformed"], 1)
+        self.assertEqual(Author.objects.count(), 4)
+
+    def test_undecodable_lines_are_400_with_line_errors(self):
+        body = (
+            b"title,publication_year,author,author_name\n"
+            b"Neuromancer,1984,,William Gibson\n"
+            b"Caf\xe9,1990,,Nobody\n"
+            b"Count Zero,1986,,William Gibson\n"
+        )
+        response = self.client.generic("POST", reverse("book-import"), body, content_type="text/csv")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["errors"], [
+            {"row": 3, "errors": {"non_field_errors": ["Line is not valid UTF-8."]}}])
+
+        body = b'{"title": "Caf\xe9", "publication_year": 1990, "author_name": "Nobody"}\n'
+        response = self.client.generic("POST", reverse("book-import"), body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"], [
+            {"row": 1, "errors": {"non_field_errors": ["Line is not valid UTF-8."]}}])
+
+    def test_unsupported_content_type(self):
+        self.assertEqual(self.post_body("{}", "application/json").status_code, 415)
+
+    def test_streaming_export(self):
+        Book.objects.create(title="Dune", publication_year=1965, author=self.existing)
+        response = self.client.get(reverse("book-export"), {"output": "csv"})
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ["id,title,publication_year,author,author_name",
+                                 f"{Book.objects.get().id},Dune,1965,{self.existing.id},Existing Author"])
+        response = self.client.get(reverse("book-export"))
+        self.assertEqual(json.loads(b"".join(response.streaming_content))["title"], "Dune")
+
+    def test_import_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "books.ndjson"
+            path.write_text("\n".join(
+                json.dumps({"title": f"Book {i}", "publication_year": 1999, "author": self.existing.id})
+                for i in range(25)
+            ))
+            out = StringIO()
+            call_command("import_books", str(path), "--batch-size", "10", stdout=out)
+        self.assertIn("Created 25 books and 0 authors; rejected 0 rows.", out.getvalue())
+        self.assertEqual(self.existing.books.count(), 25)
 
-# Create your tests here.
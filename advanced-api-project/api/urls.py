@@ -4,7 +4,11 @@ from . import views
 urlpatterns = [
     path("books/", views.BookListView.as_view(), name="book-list"),                  # List all books
     path("books/create/", views.BookCreateView.as_view(), name="book-create"),       # Create a book
+    path("books/import/", views.BookImportView.as_view(), name="book-import"),       # Bulk import CSV/NDJSON
+    path("books/export/", views.BookExportView.as_view(), name="book-export"),       # Streaming export
     path("books/<int:pk>/", views.BookDetailView.as_view(), name="book-detail"),     # Retrieve single book
     path("books/update/<int:pk>/", views.BookUpdateView.as_view(), name="book-update"), # Update book
     path("books/delete/<int:pk>/", views.BookDeleteView.as_view(), name="book-delete"), # Delete book
+    path("authors/", views.AuthorListView.as_view(), name="author-list"),            # List authors with books
+    path("authors/<int:pk>/", views.AuthorDetailView.as_view(), name="author-detail"), # Retrieve single author
 ]
@@ -1,26 +1,43 @@
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView,RetrieveAPIView, DestroyAPIView
-from .models import Book
-from .serializers import BookSerializer
+from django.db.models import Count, Prefetch
+from .models import Author, Book
+from advanced_api_project.conditional import ConditionalRetrieveMixin
+from advanced_api_project.response_cache import CachedResponseMixin
+from .serializers import AuthorSerializer, BookSerializer
+from .filters import BookSearchFilter
 from rest_framework import permissions
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
+from .bulk import BookImporter, decode_lines, export_csv, export_ndjson, export_rows, read_records
 
 
 
+class BookValuesListMixin:
+    """list() from .values() rows instead of a Book instance per row."""
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        rows = self.filter_queryset(self.get_queryset()).values(*serializer.fields)
+        return Response(serializer.values_representation(rows))
+
+
 #List all books
-class BookListView(ListAPIView):
+class BookListView(CachedResponseMixin, BookValuesListMixin, ListAPIView):
     queryset=Book.objects.all()
     serializer_class=BookSerializer
     permission_classes=[IsAuthenticatedOrReadOnly]
     
-    #Filter backends
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    #Filter backends; every filter and ordering below has an index (see Book.Meta)
+    filter_backends = [DjangoFilterBackend, BookSearchFilter, filters.OrderingFilter]
     # Filtering
     filterset_fields = ['title', 'author', 'publication_year']
-    # Searching
-    search_fields = ['title', 'author__name']
+    # Searching: title and the denormalized author name, from the api.search index
+    search_fields = ['title', 'author_name']
     # Ordering
     ordering_fields = ['title', 'publication_year']
 
@@ -35,11 +52,9 @@ class BookCreateView(CreateAPIView):
         This method is called after validation but before saving.
         You can customize creation logic here.
         """
-        # Example: prevent future publication years at view level (extra layer)
-        if serializer.validated_data['publication_year'] > 2025:
-            raise serializers.ValidationError("Cannot create a book with a future publication year.")
-
-        # Save the instance
+        # BookSerializer.validate_publication_year has already rejected future
+        # years, and the author was loaded by its PrimaryKeyRelatedField, so
+        # Book.save() skips full_clean() and only runs its query-free clean()
         serializer.save()
 
     def create(self, request, *args, **kwargs):
@@ -73,8 +88,8 @@ class BookUpdateView(UpdateAPIView):
         response.data['message'] = "Book successfully updated!"
         return response
     
-#Retrieve a single book by ID (pk)
-class BookDetailView(RetrieveAPIView):
+#Retrieve a single book by ID (pk); answers If-None-Match/If-Modified-Since with 304
+class BookDetailView(ConditionalRetrieveMixin, CachedResponseMixin, RetrieveAPIView):
     queryset=Book.objects.all()
     serializer_class=BookSerializer
     permission_classes=[IsAuthenticatedOrReadOnly]
@@ -83,4 +98,105 @@ class BookDetailView(RetrieveAPIView):
 class BookDeleteView(DestroyAPIView):
     queryset=Book.objects.all()
     serializer_class=BookSerializer
-    permission_classes=[IsAuthenticated]
\ No newline at end of file
+    permission_classes=[IsAuthenticated]
+
+
+#Bulk import books from a CSV or NDJSON request body
+class BookImportView(APIView):
+    """
+    POST a CSV (Content-Type: text/csv) or NDJSON (application/x-ndjson)
+    body. The body is read line by line and imported in batches; see
+    api.bulk for the record format. Responds with the number of books and
+    authors created and the errors of rejected rows; the status is 400 when
+    some lines could not be decoded or parsed (the readable rows are still
+    imported).
+    """
+    permission_classes = [IsAuthenticated]
+    content_types = {
+        "text/csv": "csv",
+        "application/x-ndjson": "ndjson",
+        "application/jsonl": "ndjson",
+    }
+
+    def post(self, request, *args, **kwargs):
+        fmt = self.content_types.get(request.content_type.split(";")[0].strip())
+        if fmt is None:
+            return Response(
+                {"detail": f"Content-Type must be one of {', '.join(self.content_types)}."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        # request.stream is the unparsed body; iterating it yields raw lines.
+        # It is None for an empty body
+        lines = decode_lines(request.stream or ())
+        result = BookImporter().run(read_records(lines, fmt))
+        return Response({
+            "created": result.created,
+            "authors_created": result.authors_created,
+            "error_count": result.error_count,
+            "malformed": result.malformed,
+            "errors": result.errors,
+        }, status=status.HTTP_400_BAD_REQUEST if result.malformed else status.HTTP_200_OK)
+
+
+#Stream every book as CSV or NDJSON (?output=csv|ndjson)
+class BookExportView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output == "csv":
+            response = StreamingHttpResponse(export_csv(export_rows()), content_type="text/csv")
+            response["Content-Disposition"] = 'attachment; filename="books.csv"'
+        elif output == "ndjson":
+            response = StreamingHttpResponse(export_ndjson(export_rows()), content_type="application/x-ndjson")
+        else:
+            return Response({"detail": "output must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+        return response
+
+
+
+# Nested books per author: how many by default, and the most ?books_limit= may ask for
+BOOKS_PER_AUTHOR = 5
+MAX_BOOKS_PER_AUTHOR = 50
+
+
+def authors_with_books(books_limit=BOOKS_PER_AUTHOR):
+    """
+    Authors with their newest ``books_limit`` books prefetched in one query
+    (a sliced Prefetch, which Django runs as a ROW_NUMBER() window per
+    author) and the full ``books_count`` annotated.
+    """
+    books = Book.objects.order_by('-publication_year', '-id')[:books_limit]
+    return (
+        Author.objects.annotate(books_count=Count('books'))
+        # to_attr: a sliced queryset cannot back the author.books manager
+        .prefetch_related(Prefetch('books', queryset=books, to_attr='newest_books'))
+        .order_by('name', 'id')
+    )
+
+
+class AuthorBooksMixin:
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_books_limit(self):
+        try:
+            limit = int(self.request.query_params.get('books_limit', BOOKS_PER_AUTHOR))
+        except ValueError:
+            return BOOKS_PER_AUTHOR
+        return max(0, min(limit, MAX_BOOKS_PER_AUTHOR))
+
+    def get_queryset(self):
+        return authors_with_books(self.get_books_limit())
+
+
+#List authors with their newest books (?books_limit=) and total books_count
+class AuthorListView(AuthorBooksMixin, ListAPIView):
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['name']
+    ordering_fields = ['name', 'books_count']
+
+
+#Retrieve a single author with their newest books
+class AuthorDetailView(AuthorBooksMixin, RetrieveAPIView):
+    pass
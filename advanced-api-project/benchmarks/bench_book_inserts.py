@@ -0,0 +1,65 @@
+"""
+Book inserts per second through the ORM and the API.
+
+    python -m benchmarks.bench_book_inserts [--seconds 3] [--batch 500]
+
+"save(full_clean=True)" is what every Book.save() used to cost: field
+validation plus a query to check the author exists. The API path goes
+through BookCreateView, whose serializer has already validated the data.
+"""
+import argparse
+from itertools import count
+
+from benchmarks.harness import count_queries, test_database, throughput
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import Author, Book
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    with test_database():
+        author = Author.objects.create(name="Benchmark Author")
+        numbers = count()
+
+        def book():
+            return Book(title=f"Book {next(numbers)}", publication_year=2001, author=author)
+
+        def full_clean_save():
+            book().save(full_clean=True)
+
+        def fast_save():
+            book().save()
+
+        def bulk():
+            Book.objects.validated_bulk_create([book() for _ in range(args.batch)])
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="bench", password="bench1234"))
+        url = reverse("book-create")
+
+        def api_create():
+            response = client.post(url, {"title": f"Book {next(numbers)}", "publication_year": 2001, "author": author.id})
+            assert response.status_code == 201, response.data
+
+        rows = [
+            ("ORM save(full_clean=True)", full_clean_save, 1),
+            ("ORM save()", fast_save, 1),
+            (f"ORM validated_bulk_create({args.batch})", bulk, args.batch),
+            ("API POST books/create/", api_create, 1),
+        ]
+        for label, fn, per_call in rows:
+            queries = count_queries(fn)
+            rate = throughput(fn, args.seconds) * per_call
+            print(f"{label:<36} {rate:12,.0f} inserts/s  queries/call={queries}")
+
+
+if __name__ == "__main__":
+    main()
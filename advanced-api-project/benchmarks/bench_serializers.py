@@ -0,0 +1,56 @@
+"""
+Time to fetch, serialize and render 1,000 books the way BookListView does.
+
+    python -m benchmarks.bench_serializers [--rows 1000] [--repeat 30]
+
+Compares Book instances through BookSerializer with .values() rows through
+BookSerializer.values_representation(), rendered by DRF's JSONRenderer and
+by ORJSONRenderer.
+"""
+import argparse
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from rest_framework.renderers import JSONRenderer
+
+from advanced_api_project.renderers import ORJSONRenderer
+from api.models import Author, Book
+from api.serializers import BookSerializer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with test_database():
+        authors = Author.objects.bulk_create([Author(name=f"Author {i}") for i in range(50)])
+        Book.objects.bulk_create(
+            [
+                Book(title=f"Book {i}", publication_year=1900 + i % 120, author=authors[i % 50], author_name=authors[i % 50].name)
+                for i in range(args.rows)
+            ]
+        )
+        books = Book.objects.order_by("id")
+
+        def instances():
+            return BookSerializer(books.all(), many=True).data
+
+        def values():
+            serializer = BookSerializer()
+            return serializer.values_representation(books.values(*serializer.fields))
+
+        for label, build, renderer in (
+            ("instances + JSONRenderer", instances, JSONRenderer()),
+            ("instances + ORJSONRenderer", instances, ORJSONRenderer()),
+            ("values + ORJSONRenderer", values, ORJSONRenderer()),
+        ):
+            def fn():
+                renderer.render(build())
+
+            report(label, measure(fn, repeat=args.repeat), count_queries(fn))
+
+
+if __name__ == "__main__":
+    main()
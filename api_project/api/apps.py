@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Connects the token cache's invalidation receivers in every process,
+        # not only once DRF first loads the authentication class
+        from api_project import authentication  # noqa: F401
+        from api_project.response_cache import bump_on_write
+
+        # Any book write retires the cached book responses, wherever it runs
+        book = self.get_model("Book")
+        post_save.connect(bump_on_write, sender=book, dispatch_uid="response-cache:Book")
+        post_delete.connect(bump_on_write, sender=book, dispatch_uid="response-cache:Book")
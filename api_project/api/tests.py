@@ -1,3 +1,82 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from api_project.authentication import stats, token_cache
+from .models import Book
+from .serializers import BookSerializer
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache().clear()
+        stats.clear()
+        self.user = User.objects.create_user(username="reader", password="pass1234")
+        self.token = Token.objects.create(user=self.user)
+        Book.objects.create(title="Dune", author="Frank Herbert")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    # Measure the token lookup, not the response cache in front of the list
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_warm_token_skips_token_query(self):
+        url = reverse("book-list")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(1):  # the book list itself
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(stats, {"misses": 1, "hits": 1})
+
+    def test_deleted_token_is_rejected(self):
+        url = reverse("book-list")
+        self.client.get(url)
+        self.token.delete()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        url = reverse("book-list")
+        self.client.get(url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="pass1234")
+        self.book = Book.objects.create(title="Dune", author="Frank Herbert")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_and_detail_are_cached_until_a_write(self):
+        for url in (reverse("book-list"), reverse("book_all-list"), reverse("book_all-detail", args=[self.book.id])):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.book.title = "Dune Messiah"
+        self.book.save()
+        response = self.client.get(reverse("book_all-detail", args=[self.book.id]))
+        self.assertEqual((response["X-Cache"], response.data["title"]), ("MISS", "Dune Messiah"))
+        Book.objects.create(title="Emma", author="Jane Austen")
+        self.assertEqual(len(self.client.get(reverse("book-list")).data), 2)
+
+    def test_users_do_not_share_entries(self):
+        self.client.get(reverse("book-list"))
+        self.client.force_authenticate(User.objects.create_user(username="other", password="pass1234"))
+        self.assertEqual(self.client.get(reverse("book-list"))["X-Cache"], "MISS")
+
+
+class BookListValuesPathTests(TestCase):
+    def test_list_matches_serializer(self):
+        Book.objects.create(title="Dune", author="Frank Herbert")
+        Book.objects.create(title="Emma", author="Jane Austen")
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="reader", password="pass1234"))
+        expected = BookSerializer(Book.objects.all(), many=True).data
+        for url in (reverse("book-list"), reverse("book_all-list")):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).data, expected)
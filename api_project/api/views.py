@@ -3,8 +3,22 @@ from rest_framework import generics
 from .models import Book
 from .serializers import BookSerializer
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response
+from api_project.response_cache import CachedResponseMixin
 
-class BookList(generics.ListAPIView):
+class BookValuesListMixin:
+    """
+    list() straight from .values() rows: id, title and author are already
+    JSON-ready, so BookSerializer has nothing to convert.
+    """
+    def list(self, request, *args, **kwargs):
+        rows = self.filter_queryset(self.get_queryset()).values(*BookSerializer().fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
+class BookList(CachedResponseMixin, BookValuesListMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
@@ -17,7 +31,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         return request.user and request.user.is_staff
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(CachedResponseMixin, BookValuesListMixin, viewsets.ModelViewSet):
     """
     A viewset that provides the standard actions
     for listing, creating, retrieving, updating, and deleting Books.
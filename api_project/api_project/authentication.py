@@ -0,0 +1,53 @@
+"""
+TokenAuthentication that keeps validated tokens in the "tokens" cache.
+
+That alias (see CACHES in settings) is a bounded LocMemCache whose TIMEOUT
+is the token TTL; point it at a shared backend to share tokens between
+processes. Saving or deleting a token, or its user, drops the entry; with
+the per-process default that reaches only the worker that made the change,
+and the others refuse a revoked token once their entry times out.
+Hit and miss counts are kept in ``stats``.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+stats = Counter()
+
+
+def token_cache():
+    return caches["tokens"]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        entry = cache.get(f"token:{key}")
+        stats["hits" if entry is not None else "misses"] += 1
+        if entry is None:
+            # Raises AuthenticationFailed for unknown keys and inactive users
+            entry = super().authenticate_credentials(key)
+            user, token = entry
+            cache.set_many({f"token:{key}": entry, f"user:{user.pk}": key})
+        # The cache hands back an unpickled copy, so requests never share a user
+        return entry
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache().delete_many([f"token:{instance.key}", f"user:{instance.user_id}"])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_user_token(sender, instance, **kwargs):
+    cache = token_cache()
+    key = cache.get(f"user:{instance.pk}")
+    if key is not None:
+        cache.delete_many([f"token:{key}", f"user:{instance.pk}"])
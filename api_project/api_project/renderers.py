@@ -0,0 +1,22 @@
+"""
+ORJSONRenderer renders the book lists with orjson. The bytes match DRF's
+compact JSONRenderer output; without orjson installed it is JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        option = orjson.OPT_NON_STR_KEYS
+        # orjson has a single indent width; use it whenever an indent is asked for
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=JSONEncoder().default, option=option)
@@ -0,0 +1,70 @@
+"""
+Cached reads for the book endpoints (BookList and BookViewSet list/retrieve).
+
+Successful responses are kept as rendered bytes, keyed by path, sorted query
+parameters, reader (user id or anonymous), renderer format and a generation
+number. Every Book save or delete bumps the generation (connected in
+``api.apps``), which retires all cached book responses at once; they
+carry ``X-Cache: HIT`` or ``MISS``.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+GENERATION_KEY = "books:generation"
+
+
+def generation():
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def bump():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        pass  # no counter yet; the next read starts a fresh one
+
+
+def bump_on_write(sender, **kwargs):
+    bump()
+    # Bump again at commit, in case a read cached the old rows meanwhile
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    def cache_key(self, request):
+        user = request.user
+        parts = repr([
+            request.path,
+            sorted(request.query_params.lists()),
+            user.pk if user and user.is_authenticated else None,
+            request.accepted_renderer.format,
+            generation(),
+        ])
+        return "books:response:" + hashlib.md5(parts.encode()).hexdigest()
+
+    def cached(self, handler, request, *args, **kwargs):
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        if timeout <= 0:
+            return handler(request, *args, **kwargs)
+        key = self.cache_key(request)
+        hit = cache.get(key)
+        if hit is not None:
+            response = HttpResponse(hit[1], content_type=hit[0])
+            response["X-Cache"] = "HIT"
+            return response
+        response = handler(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200:
+            response.add_post_render_callback(lambda r: cache.set(key, (r["Content-Type"], r.content), timeout))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
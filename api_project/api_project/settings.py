@@ -128,15 +128,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api_project.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # Require login by default
-    ]
+    ],
+    # orjson-backed JSON first (api_project/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api_project.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
 # DRF configuration:
 # TokenAuthentication -> Clients send a token in 'Authorization: Token <token>'
+#   (CachedTokenAuthentication caches validated tokens, see CACHES below)
 # IsAuthenticated -> Require token for all requests unless overridden in views
 # To create a token: POST username/password to /api/get-token/
+
+# Token cache (api_project/authentication.py): validated tokens are kept in
+# the "tokens" alias for TIMEOUT seconds. Swap it for a shared backend (e.g.
+# Redis) to share them between processes
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Response cache (api_project/response_cache.py): seconds a rendered book
+# list/detail stays cached; model signals invalidate it sooner. 0 turns it off
+RESPONSE_CACHE_TIMEOUT = 60
@@ -0,0 +1,51 @@
+"""
+Book endpoint latency with the response cache off and on.
+
+    python -m benchmarks.bench_response_cache [--rows 2000] [--repeat 200]
+
+Seeds ``--rows`` books, then reads BookList, the BookViewSet list and one
+BookViewSet detail, first with RESPONSE_CACHE_TIMEOUT=0 and then cached.
+"""
+import argparse
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import Book
+
+
+def seed(rows, user):
+    Book.objects.bulk_create([Book(title=f"Book {i}", author=f"Author {i % 100}") for i in range(rows)], batch_size=1000)
+    book = Book.objects.order_by("pk").first()
+    return [reverse("book-list"), reverse("book_all-list"), reverse("book_all-detail", args=[book.pk])]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with test_database():
+        user = get_user_model().objects.create_user(username="bench", password="bench1234")
+        urls = seed(args.rows, user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for url in urls:
+            for label, timeout in (("uncached", 0), ("cached", 60)):
+                with override_settings(RESPONSE_CACHE_TIMEOUT=timeout):
+                    def fn():
+                        response = client.get(url, secure=True)
+                        assert response.status_code == 200, response.status_code
+
+                    samples = measure(fn, repeat=args.repeat)
+                    report(f"{label} {url}", samples, count_queries(fn))
+
+
+if __name__ == "__main__":
+    main()
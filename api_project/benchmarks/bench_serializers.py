@@ -0,0 +1,43 @@
+"""
+Time to fetch, serialize and render 1,000 books, per BookList path.
+
+    python -m benchmarks.bench_serializers [--rows 1000] [--repeat 30]
+
+Compares Book instances through BookSerializer (rendered by JSONRenderer
+and by ORJSONRenderer) with the plain .values() rows BookList now returns.
+"""
+import argparse
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Book
+from api.serializers import BookSerializer
+from api_project.renderers import ORJSONRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with test_database():
+        Book.objects.bulk_create([Book(title=f"Book {i}", author=f"Author {i % 100}") for i in range(args.rows)])
+        books = Book.objects.order_by("id")
+
+        paths = (
+            ("instances + JSONRenderer", lambda: BookSerializer(books.all(), many=True).data, JSONRenderer()),
+            ("instances + ORJSONRenderer", lambda: BookSerializer(books.all(), many=True).data, ORJSONRenderer()),
+            ("values + ORJSONRenderer", lambda: list(books.values("id", "title", "author")), ORJSONRenderer()),
+        )
+        for label, build, renderer in paths:
+            def fn():
+                renderer.render(build())
+
+            report(label, measure(fn, repeat=args.repeat), count_queries(fn))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Anonymous page throughput with the blog cache layer off and on.
+
+    python -m benchmarks.bench_anonymous [--posts 2000] [--comments 50] [--seconds 3]
+
+"Uncached" swaps in DummyCache, so every request renders templates and
+queries the database as before the cache layer existed.
+"""
+import argparse
+
+from benchmarks.harness import test_database, throughput
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Comment, Post, Tag, make_excerpt
+from blog.tagcloud import refresh_counts
+
+UNCACHED = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def seed(posts, comments):
+    authors = User.objects.bulk_create([User(username=f'author{i}', password='!') for i in range(20)])
+    tag = Tag.objects.create(name='django')
+    content = 'Lorem ipsum dolor sit amet. ' * 80
+    Post.objects.bulk_create(
+        [
+            Post(author=authors[i % len(authors)], title=f'Post {i}', content=content, excerpt=make_excerpt(content))
+            for i in range(posts)
+        ],
+        batch_size=1000,
+    )
+    busiest = Post.objects.order_by('-id').first()
+    tag.posts.add(*Post.objects.order_by('-id')[:200])
+    refresh_counts([tag.pk])
+    Comment.objects.bulk_create(
+        [Comment(post=busiest, author=authors[i % len(authors)], content=f'comment {i}') for i in range(comments)]
+    )
+    return {
+        'post list': reverse('post-list'),
+        'post detail': reverse('post-detail', args=[busiest.pk]),
+        'author page': reverse('user-posts', args=['author0']),
+        'tag page': reverse('posts-by-tag', args=[tag.slug]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    with test_database():
+        pages = seed(args.posts, args.comments)
+        client = Client()
+        for label, url in pages.items():
+            with override_settings(CACHES=UNCACHED):
+                before = throughput(lambda: client.get(url), args.seconds)
+            cache.clear()
+            after = throughput(lambda: client.get(url), args.seconds)
+            print(f'{label:<14} uncached {before:8.1f} req/s   cached {after:8.1f} req/s   x{after / before:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Page and fragment caching for the blog.
+
+Cached content is keyed by generation counters instead of being deleted
+key by key: a write bumps the counters it affects (see blog.signals) and
+every key built from the old value simply stops being read, then expires.
+
+* ``posts`` covers every list page (home, post list, author and tag pages).
+* ``post:<pk>`` covers one post's detail page.
+* ``post:<pk>:comments`` covers the comment list fragment of one post.
+
+Post bodies are cached as template fragments keyed by ``updated_at``
+directly, so they need no counter.
+
+Whole pages are only cached for anonymous GET requests; logged-in pages
+carry per-user links and CSRF tokens.
+
+ConditionalGetMixin answers revalidations (If-None-Match) with a 304 from
+the same cheap versions, before any page is rendered or read from cache.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+
+GENERATION_PREFIX = 'blog:gen:'
+PAGE_PREFIX = 'blog:page:'
+
+
+def cache_timeout():
+    return getattr(settings, 'BLOG_CACHE_TIMEOUT', 300)
+
+
+def generation(name):
+    # A missing (never set or evicted) counter restarts from a value no
+    # earlier page can have been cached under
+    return cache.get_or_set(GENERATION_PREFIX + name, time.time_ns, timeout=None)
+
+
+def bump(*names):
+    for name in names:
+        try:
+            cache.incr(GENERATION_PREFIX + name)
+        except ValueError:
+            pass  # no counter yet: the next read starts a fresh one
+
+
+def post_generation(pk):
+    return f'post:{pk}'
+
+
+def comments_generation(pk):
+    return f'post:{pk}:comments'
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve anonymous GETs of a view from the cache. Views list the
+    generations their output depends on in ``get_cache_generations()``.
+    """
+
+    def get_cache_generations(self):
+        return ['posts']
+
+    def page_cache_key(self, request):
+        versions = '.'.join(f'{name}={generation(name)}' for name in self.get_cache_generations())
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f'{PAGE_PREFIX}{path}:{versions}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        self.args, self.kwargs = args, kwargs
+        key = self.page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        patch_vary_headers(response, ['Cookie'])
+        if response.status_code == 200:
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(lambda r: cache.set(key, r, cache_timeout()))
+            else:
+                cache.set(key, response, cache_timeout())
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag support for views whose output is fully determined by a few cheap
+    version values. ``get_etag_parts()`` returns them, or None to skip
+    (e.g. the object does not exist).
+    """
+
+    def get_etag_parts(self):
+        raise NotImplementedError
+
+    def compute_etag(self, request):
+        parts = self.get_etag_parts()
+        if parts is None:
+            return None
+        # Pages differ per viewer (edit links), so the viewer is part of the tag
+        viewer = request.user.pk if request.user.is_authenticated else 'anon'
+        return quote_etag(hashlib.md5(repr([viewer, *parts]).encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        self.args, self.kwargs = args, kwargs
+        etag = None
+        if request.headers.get('If-None-Match'):
+            etag = self.compute_etag(request)
+            response = get_conditional_response(request, etag=etag) if etag else None
+            if response is not None:
+                response.headers['ETag'] = etag
+                return response
+        response = super().dispatch(request, *args, **kwargs)
+        # Pages served from the page cache already carry the ETag they were rendered with
+        if response.status_code == 200 and not response.has_header('ETag'):
+            etag = etag or self.compute_etag(request)
+            if etag:
+                response.headers['ETag'] = etag
+                patch_vary_headers(response, ['Cookie'])
+        return response
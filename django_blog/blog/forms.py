@@ -1,10 +1,14 @@
+from functools import lru_cache
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.text import slugify
 from .models import Profile
 from .models import Post, Tag
 from .models import Comment
-from taggit.forms import TagWidget 
 
 class RegisterForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -32,14 +36,6 @@ class ProfileUpdateForm(forms.ModelForm):
         fields = ['bio', 'avatar']
         
 
-class PostForm(forms.ModelForm):
-    class Meta:
-        model = Post
-        fields = ['title', 'content', 'tags']   # include tags
-        widgets = {
-            'tags': TagWidget(),               # ✅ use TagWidget
-        }
-
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
@@ -47,22 +43,84 @@ class CommentForm(forms.ModelForm):
         widgets = {
             'content': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Write a comment...'})
         }
-        
+
+
+@lru_cache(maxsize=1024)
+def normalize_tag_name(name):
+    """Canonical spelling of a tag: trimmed, single-spaced, lower case, fits Tag.name."""
+    return ' '.join(name.split()).lower()[:Tag._meta.get_field('name').max_length]
+
+
+def parse_tag_names(value):
+    """Unique normalized names from a comma-separated string, in the order given."""
+    names = (normalize_tag_name(name) for name in value.split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def tags_by_normalized_name(names):
+    """``{normalized name: Tag}`` for the existing tags matching ``names`` in any case; the oldest wins."""
+    tags = {}
+    for tag in Tag.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=names).order_by('-pk'):
+        tags[tag.lower_name] = tag
+    return tags
+
+
+def resolve_tags(names):
+    """
+    Tag objects for ``names``, creating the missing ones. Costs one IN query
+    when every tag exists, and two more (a bulk INSERT and a re-read) when
+    some are new, however many names there are.
+
+    Existing tags match case-insensitively, so a "Django" tag created
+    before names were normalized is reused rather than duplicated.
+    """
+    if not names:
+        return []
+    tags = tags_by_normalized_name(names)
+    missing = [name for name in names if name not in tags]
+    if missing:
+        # Conflicts are tags created concurrently, or a slug already in use
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugify(name)[:50] or 'tag') for name in missing],
+            ignore_conflicts=True,
+        )
+        tags.update(tags_by_normalized_name(missing))
+        for name in missing:
+            if name not in tags:
+                tags[name], _ = Tag.objects.get_or_create(name=name)  # save() picks a free slug
+    return [tags[name] for name in names]
+
+
 class PostForm(forms.ModelForm):
     tags = forms.CharField(required=False, help_text="Enter tags separated by commas")
 
     class Meta:
         model = Post
-        fields = ['title', 'content', 'tags']
+        # tags is handled by save_tags(), not the default M2M save
+        fields = ['title', 'content']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and not self.is_bound:
+            self.initial['tags'] = ', '.join(tag.name for tag in self.instance.tags.all())
 
     def save(self, commit=True):
         instance = super().save(commit=False)
+        self._new_post = instance._state.adding
         if commit:
-            instance.save()
-            tags_str = self.cleaned_data['tags']
-            if tags_str:
-                tag_names = [t.strip() for t in tags_str.split(',')]
-                for name in tag_names:
-                    tag, created = Tag.objects.get_or_create(name=name)
-                    instance.tags.add(tag)
-        return instance
\ No newline at end of file
+            with transaction.atomic():
+                instance.save()
+                self.save_tags()
+        else:
+            self.save_m2m = self.save_tags
+        return instance
+
+    def save_tags(self):
+        """Make the post's tags exactly those entered: one bulk add and one bulk remove at most."""
+        tags = resolve_tags(parse_tag_names(self.cleaned_data.get('tags') or ''))
+        wanted = {tag.pk for tag in tags}
+        current = set() if self._new_post else set(self.instance.tags.values_list('pk', flat=True))
+        if current - wanted:
+            self.instance.tags.remove(*(current - wanted))
+        if wanted - current:
+            self.instance.tags.add(*[tag for tag in tags if tag.pk not in current])
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_index(apps, schema_editor):
+    from blog.search import post_terms
+
+    Post = apps.get_model('blog', 'Post')
+    SearchIndexEntry = apps.get_model('blog', 'SearchIndexEntry')
+    entries = [
+        SearchIndexEntry(post_id=post.pk, term=term, weight=weight)
+        for post in Post.objects.prefetch_related('tags')
+        for term, weight in post_terms(post.title, post.content, [tag.name for tag in post.tags.all()]).items()
+    ]
+    SearchIndexEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_post_tags_comments_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='blog.post')),
+            ],
+            options={
+                'unique_together': {('term', 'post')},
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
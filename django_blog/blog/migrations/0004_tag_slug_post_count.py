@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+
+def populate_tags(apps, schema_editor):
+    Tag = apps.get_model('blog', 'Tag')
+    Post = apps.get_model('blog', 'Post')
+
+    taken = set()
+    for tag in Tag.objects.order_by('pk'):
+        base = slugify(tag.name)[:50] or 'tag'
+        slug, n = base, 1
+        while slug in taken:
+            n += 1
+            slug = f'{base}-{n}'
+        taken.add(slug)
+        tag.slug = slug
+        tag.save(update_fields=['slug'])
+
+    counts = (
+        Post.tags.through.objects.filter(tag=OuterRef('pk'))
+        .order_by().values('tag').annotate(total=Count('id')).values('total')
+    )
+    Tag.objects.update(post_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_search_index_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(default='', max_length=60),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(max_length=60, unique=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def make_excerpt(content):
+    # Frozen copy of blog.models.make_excerpt as of this migration
+    text = ' '.join(strip_tags(content or '').split())
+    return Truncator(text).chars(200)
+
+
+def populate_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'content').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = make_excerpt(post.content)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_tag_slug_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_date', '-id'], name='post_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-published_date', '-id'], name='post_author_recent_idx'),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
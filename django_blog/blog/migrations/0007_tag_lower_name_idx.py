@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:53
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_comment_thread_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='tag_lower_name_idx'),
+        ),
+    ]
@@ -1,13 +1,50 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator, slugify
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    slug = models.SlugField(max_length=60, unique=True)
+    # Maintained from blog.signals via blog.tagcloud.refresh_counts()
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # PostForm looks existing tags up by lower-cased name (blog.forms)
+            models.Index(Lower('name'), name='tag_lower_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(self.name)
+        super().save(*args, **kwargs)
+
+
+def unique_slug(name):
+    """slugify(name), suffixed with -2, -3... until no other tag uses it."""
+    base = slugify(name)[:50] or 'tag'
+    slug, n = base, 1
+    while Tag.objects.filter(slug=slug).exists():
+        n += 1
+        slug = f'{base}-{n}'
+    return slug
+
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content):
+    """``content`` as plain text, truncated with an ellipsis to EXCERPT_LENGTH characters."""
+    text = ' '.join(strip_tags(content or '').split())
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
 # Create your models here.
 class Post(models.Model):
     title=models.CharField(max_length=200)
@@ -17,9 +54,28 @@ class Post(models.Model):
     tags = models.ManyToManyField(Tag, related_name="posts", blank=True)  # ✅ Many-to-many
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+    # Plain-text lead of content, set in save() so list pages can defer content
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-published_date', '-id'], name='post_recent_idx'),
+            models.Index(fields=['author', '-published_date', '-id'], name='post_author_recent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title}"
+
+    def get_absolute_url(self):
+        return reverse('post-detail', kwargs={'pk': self.pk})
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
     
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -38,6 +94,28 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # ✅ timestamp when created
     updated_at = models.DateTimeField(auto_now=True) 
 
+    class Meta:
+        indexes = [
+            # A post's thread in (created_at, id) order, for keyset "load more"
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_thread_idx'),
+        ]
+
     def __str__(self):
-        return f"Comment by {self.author.username} on {self.post.title}"
-    
+        # Only use relations already loaded; listing comments must not cost a query each
+        author = self.author.username if Comment.author.is_cached(self) else f"user {self.author_id}"
+        post = self.post.title if Comment.post.is_cached(self) else f"post {self.post_id}"
+        return f"Comment by {author} on {post}"
+
+
+class SearchIndexEntry(models.Model):
+    """One term of a post's title, content or tag names, with its summed weight (see blog.search)."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='search_entries')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Prefix searches are range scans on term; the post id rides along in the index
+        unique_together = ('term', 'post')
+
+    def __str__(self):
+        return f"{self.term} -> {self.post_id} ({self.weight})"
@@ -0,0 +1,49 @@
+"""
+Keyset ("load more") pagination for posts and comments.
+
+A cursor encodes the (timestamp, id) of the last row shown; the next page
+is the rows strictly past it in ``(timestamp, id)`` order. Unlike OFFSET
+paging the cost of a page does not grow with its depth, and rows added
+meanwhile do not shift later pages.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(timestamp, pk):
+    raw = f'{timestamp.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """The (timestamp, id) position in ``cursor``, or None when it is malformed."""
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, size=10, field='published_date', descending=True):
+    """
+    One page of ``queryset`` ordered by ``(field, id)`` after ``cursor``;
+    newest first by default. Returns ``(rows, next_cursor)``; next_cursor
+    is None on the last page.
+    """
+    prefix = '-' if descending else ''
+    queryset = queryset.order_by(prefix + field, prefix + 'id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        timestamp, pk = position
+        past = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{field}__{past}': timestamp}) | Q(**{field: timestamp, f'pk__{past}': pk})
+        )
+    rows = list(queryset[:size + 1])
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(getattr(rows[-1], field), rows[-1].pk)
+    return rows, None
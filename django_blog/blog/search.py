@@ -0,0 +1,120 @@
+"""
+Inverted index for blog search.
+
+Every post is broken into lower-cased word terms from its title, content
+and tag names; each (term, post) pair is stored once in SearchIndexEntry
+with a weight of ``occurrences x field weight``. A search is then a range
+scan per query term over the (term, post) index, grouped by post and
+ranked by summed weight, so it never touches the content column, never
+joins through the tag M2M and never needs DISTINCT.
+
+The index is kept current from signals (see blog.signals): a post is
+re-indexed when it is saved or its tags change, and a renamed tag
+re-indexes the posts carrying it.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Post, SearchIndexEntry
+
+TITLE_WEIGHT = 5
+TAG_WEIGHT = 3
+CONTENT_WEIGHT = 1
+
+# Longer words are truncated to fit SearchIndexEntry.term
+MAX_TERM_LENGTH = 64
+# Query terms beyond this are ignored
+MAX_QUERY_TERMS = 8
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return [word[:MAX_TERM_LENGTH] for word in _WORD_RE.findall(text.lower())]
+
+
+def post_terms(title, content, tag_names):
+    """Weighted term counts for one post."""
+    terms = Counter()
+    for text, weight in [(title, TITLE_WEIGHT), (content, CONTENT_WEIGHT)] + [(name, TAG_WEIGHT) for name in tag_names]:
+        for term in tokenize(text or ""):
+            terms[term] += weight
+    return terms
+
+
+@transaction.atomic
+def index_post(post, tag_names=None):
+    """Replace the index entries of a single post."""
+    if tag_names is None:
+        tag_names = post.tags.values_list('name', flat=True)
+    terms = post_terms(post.title, post.content, tag_names)
+    SearchIndexEntry.objects.filter(post=post).delete()
+    SearchIndexEntry.objects.bulk_create(
+        [SearchIndexEntry(post=post, term=term, weight=weight) for term, weight in terms.items()]
+    )
+
+
+def index_posts(post_ids):
+    for post in Post.objects.filter(pk__in=list(post_ids)).prefetch_related('tags'):
+        index_post(post, [tag.name for tag in post.tags.all()])
+
+
+def rebuild_index(batch_size=500):
+    """Re-index every post, one batch of posts per transaction. Returns the number indexed."""
+    SearchIndexEntry.objects.all().delete()
+    indexed = 0
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').prefetch_related('tags')[:batch_size]
+        )
+        if not posts:
+            return indexed
+        last_pk = posts[-1].pk
+        entries = [
+            SearchIndexEntry(post=post, term=term, weight=weight)
+            for post in posts
+            for term, weight in post_terms(post.title, post.content, [t.name for t in post.tags.all()]).items()
+        ]
+        SearchIndexEntry.objects.bulk_create(entries, batch_size=1000)
+        indexed += len(posts)
+
+
+def _prefix(term):
+    # term <= x < term-with-last-char-bumped is a prefix match the index can range-scan
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return Q(term__gte=term, term__lt=upper)
+
+
+def ranked_post_ids(query):
+    """
+    ``{'post_id', 'score'}`` rows for posts matching every word of
+    ``query`` as a prefix, best first. Paginate this, then load the posts
+    of one page with load_posts().
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return SearchIndexEntry.objects.none().values('post_id')
+    any_term = Q()
+    matched = {}
+    for i, term in enumerate(terms):
+        any_term |= _prefix(term)
+        matched[f'matched_{i}'] = Count('pk', filter=_prefix(term))
+    return (
+        SearchIndexEntry.objects.filter(any_term)
+        .values('post_id')
+        .annotate(score=Sum('weight'), **matched)
+        .filter(**{f'{name}__gt': 0 for name in matched})
+        .values('post_id', 'score')
+        .order_by('-score', '-post_id')
+    )
+
+
+def load_posts(rows):
+    """The posts behind a page of ranked_post_ids() rows, in rank order."""
+    ids = [row['post_id'] for row in rows]
+    posts = Post.objects.select_related('author').defer('content').in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
@@ -1,7 +1,9 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import Profile
+from .models import Comment, Post, Profile, Tag
+from . import search, tagcloud
+from .caching import bump, comments_generation, post_generation
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
@@ -9,4 +11,72 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
     else:
         # ensure profile exists
-        Profile.objects.get_or_create(user=instance)
\ No newline at end of file
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_retagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Remember the posts losing this tag; post_clear does not receive them
+        instance._search_cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        search.index_post(instance)
+    elif action == 'post_clear':
+        search.index_posts(getattr(instance, '_search_cleared_post_ids', []))
+    else:
+        search.index_posts(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def index_renamed_tag(sender, instance, created, **kwargs):
+    if not created:
+        search.index_posts(instance.posts.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        tagcloud.refresh_counts([instance.pk] if reverse else pk_set)
+    elif action == 'post_clear':
+        tagcloud.refresh_counts([instance.pk] if reverse else getattr(instance, '_cleared_tag_ids', []))
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    # The M2M rows go with the post without an m2m_changed signal
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def refresh_deleted_post_tags(sender, instance, **kwargs):
+    tagcloud.refresh_counts(getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    bump('posts', post_generation(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    bump(post_generation(instance.post_id), comments_generation(instance.post_id))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(post_save, sender=Tag)
+def invalidate_tag_pages(sender, action=None, **kwargs):
+    if action is None or action.startswith('post_'):
+        bump('posts')
+
@@ -0,0 +1,42 @@
+"""
+Stored per-tag post counts and the cached tag cloud built from them.
+
+Tag.post_count is refreshed from blog.signals for exactly the tags whose
+posts changed, so the cloud is a plain indexed read instead of a GROUP BY
+over the whole tag M2M on every request. The rendered list is cached until
+the next count change.
+"""
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, Tag
+
+TAG_CLOUD_CACHE_KEY = 'blog:tag-cloud'
+TAG_CLOUD_SIZE = 30
+
+
+def refresh_counts(tag_ids):
+    """Recount the posts of the given tags in one UPDATE."""
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return
+    counts = (
+        Post.tags.through.objects.filter(tag=OuterRef('pk'))
+        .order_by().values('tag').annotate(total=Count('id')).values('total')
+    )
+    Tag.objects.filter(pk__in=tag_ids).update(
+        post_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    )
+    cache.delete(TAG_CLOUD_CACHE_KEY)
+
+
+def tag_cloud():
+    """The most used tags, busiest first, as a list of Tag objects."""
+    cloud = cache.get(TAG_CLOUD_CACHE_KEY)
+    if cloud is None:
+        cloud = list(
+            Tag.objects.filter(post_count__gt=0).order_by('-post_count', 'name')[:TAG_CLOUD_SIZE]
+        )
+        cache.set(TAG_CLOUD_CACHE_KEY, cloud)
+    return cloud
@@ -1,3 +1,330 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import caching, search, tagcloud
+from .forms import PostForm, parse_tag_names, tags_by_normalized_name
+from .models import EXCERPT_LENGTH, Comment, Post, SearchIndexEntry, Tag
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.python = Tag.objects.create(name='python')
+        self.in_title = Post.objects.create(author=self.author, title='Django signals', content='hooks')
+        self.in_body = Post.objects.create(author=self.author, title='Notes', content='about django and more')
+        self.tagged = Post.objects.create(author=self.author, title='Snakes', content='scales')
+        self.tagged.tags.add(self.python)
+
+    def ids(self, query):
+        return [row['post_id'] for row in search.ranked_post_ids(query)]
+
+    def test_ranked_prefix_matches(self):
+        self.assertEqual(self.ids('djan'), [self.in_title.pk, self.in_body.pk])
+        self.assertEqual(self.ids('django hooks'), [self.in_title.pk])
+        self.assertEqual(self.ids('pyth'), [self.tagged.pk])
+        self.assertEqual(self.ids('   '), [])
+
+    def test_index_follows_post_and_tag_changes(self):
+        self.in_body.content = 'flask instead'
+        self.in_body.save()
+        self.assertEqual(self.ids('django'), [self.in_title.pk])
+
+        self.python.posts.add(self.in_title)
+        # Equal weight, so newest post first
+        self.assertEqual(self.ids('python'), [self.tagged.pk, self.in_title.pk])
+
+        self.python.name = 'ruby'
+        self.python.save()
+        self.assertEqual(self.ids('python'), [])
+        self.assertEqual(len(self.ids('ruby')), 2)
+
+        self.tagged.tags.remove(self.python)
+        self.python.posts.clear()
+        self.assertEqual(self.ids('ruby'), [])
+
+        self.in_title.delete()
+        self.assertEqual(self.ids('signals'), [])
+
+    def test_search_sql_has_no_distinct_or_content_scan(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('search-posts'), {'q': 'django'})
+        self.assertEqual([p.pk for p in response.context['results']], [self.in_title.pk, self.in_body.pk])
+        for query in ctx.captured_queries:
+            self.assertNotIn('DISTINCT', query['sql'])
+            self.assertNotIn('LIKE', query['sql'])
+
+    def test_results_are_paginated(self):
+        Post.objects.bulk_create([Post(author=self.author, title=f'django {i}', content='') for i in range(25)])
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.client.get(reverse('search-posts'), {'q': 'django', 'page': 3})
+        self.assertEqual(response.context['page_obj'].paginator.count, 27)
+        self.assertEqual(len(response.context['results']), 7)
+
+    def test_rebuild_command(self):
+        SearchIndexEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 3 posts', out.getvalue())
+        self.assertEqual(self.ids('scales'), [self.tagged.pk])
+
+
+class TagPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.django = Tag.objects.create(name='Django')
+        self.web = Tag.objects.create(name='Web')
+        self.posts = [Post.objects.create(author=self.author, title=f'post {i}', content='') for i in range(12)]
+        for post in self.posts:
+            post.tags.add(self.django, self.web)
+
+    def counts(self):
+        return dict(Tag.objects.values_list('name', 'post_count'))
+
+    def test_keyset_pages_cover_every_post_once(self):
+        url = reverse('posts-by-tag', args=[self.django.slug])
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(url, {'cursor': cursor} if cursor else {})
+            seen += [post.pk for post in response.context['posts']]
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+
+    def test_page_queries_do_not_grow_with_posts(self):
+        url = reverse('posts-by-tag', args=[self.django.slug])
+        self.client.get(url)  # warm the tag cloud cache
+        caching.bump('posts')  # but not the page itself
+        # tag, page of posts, prefetched tags
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 200)
+
+    def test_counts_follow_tag_changes(self):
+        self.assertEqual(self.counts(), {'Django': 12, 'Web': 12})
+        self.posts[0].tags.remove(self.web)
+        self.posts[1].tags.clear()
+        self.web.posts.remove(self.posts[2])
+        self.posts[3].delete()
+        self.assertEqual(self.counts(), {'Django': 10, 'Web': 8})
+        self.django.posts.clear()
+        self.assertEqual(self.counts(), {'Django': 0, 'Web': 8})
+
+    def test_tag_cloud_is_cached_until_counts_change(self):
+        self.assertEqual([tag.name for tag in tagcloud.tag_cloud()], ['Django', 'Web'])
+        with self.assertNumQueries(0):
+            tagcloud.tag_cloud()
+        self.posts[0].tags.remove(self.django)
+        self.assertEqual([tag.name for tag in tagcloud.tag_cloud()], ['Web', 'Django'])
+
+
+class PostFormTagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+
+    def save(self, tags, instance=None):
+        form = PostForm({'title': 'Tagged', 'content': 'body', 'tags': tags},
+                        instance=instance or Post(author=self.author))
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_names_are_normalized_and_deduplicated(self):
+        self.assertEqual(parse_tag_names(' Django ,django,  Web  Dev ,, '), ['django', 'web dev'])
+
+    def test_fifty_tags_cost_a_fixed_number_of_queries(self):
+        names = ', '.join(f'tag {i}' for i in range(50))
+        Tag.objects.create(name='tag 0')
+        with CaptureQueriesContext(connection) as few:
+            self.save('tag 0, tag 1, tag 2')
+        with self.assertNumQueries(len(few.captured_queries)):
+            post = self.save(names)
+        # post insert, tag lookup + bulk insert + re-read, M2M add (2), tag
+        # counts, search index twice (3 each) and 6 transaction statements
+        self.assertEqual(len(few.captured_queries), 19)
+        self.assertEqual(post.tags.count(), 50)
+        self.assertEqual(Tag.objects.count(), 50)
+
+    def test_edit_replaces_tag_set(self):
+        post = self.save('a, b, c')
+        form = PostForm(instance=post)
+        self.assertEqual(form.initial['tags'], 'a, b, c')
+        self.save('c, d', instance=post)
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['c', 'd'])
+        self.assertEqual(Tag.objects.get(name='a').post_count, 0)
+
+    def test_existing_mixed_case_tag_is_reused(self):
+        django = Tag.objects.create(name='Django')
+        post = self.save('django, DJANGO, python')
+        self.assertEqual(list(post.tags.order_by('pk')), [django, Tag.objects.get(name='python')])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_tag_lookup_uses_the_lower_name_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("EXPLAIN QUERY PLAN output is SQLite's")
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            tags_by_normalized_name(['django', 'python'])
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries.captured_queries[0]['sql'])
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('tag_lower_name_idx', plan)
+
+    def test_slug_collisions_fall_back_to_unique_slugs(self):
+        post = self.save('c++, c#, c')
+        self.assertEqual(sorted(post.tags.values_list('slug', flat=True)), ['c', 'c-2', 'c-3'])
+
+
+class ListPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.posts = [
+            Post.objects.create(author=self.author, title=f'post {i}', content=f'<p>Body {i}</p> ' + 'word ' * 100)
+            for i in range(12)
+        ]
+
+    def test_excerpt_is_stored_on_save(self):
+        post = self.posts[0]
+        self.assertTrue(post.excerpt.startswith('Body 0 word'))
+        self.assertLessEqual(len(post.excerpt), EXCERPT_LENGTH)
+        post.content = 'short'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'short')
+
+    def test_list_pages_are_paginated_without_content(self):
+        for url in (reverse('home'), reverse('post-list'), reverse('user-posts', args=['author'])):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, {'page': 2})
+            self.assertEqual([p.title for p in response.context['posts']], [f'post {i}' for i in (6, 5, 4, 3, 2)])
+            self.assertContains(response, 'Body 6 word')
+            post_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "blog_post"' in q['sql']]
+            # page count and the page itself; the author comes in the same join
+            self.assertEqual(len(post_queries), 2, post_queries)
+            self.assertNotIn('"blog_post"."content"', post_queries[-1])
+            self.assertIn('"auth_user"', post_queries[-1])
+
+
+class CachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.reader = User.objects.create_user(username='reader', password='pass1234')
+        self.post = Post.objects.create(author=self.author, title='Cached', content='body')
+        self.url = reverse('post-detail', args=[self.post.pk])
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for url in (self.url, reverse('post-list'), reverse('user-posts', args=['author'])):
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertContains(response, 'Cached')
+
+    def test_writes_invalidate_affected_pages(self):
+        self.client.get(self.url)
+        self.client.get(reverse('post-list'))
+        Comment.objects.create(post=self.post, author=self.reader, content='first!')
+        self.assertContains(self.client.get(self.url), 'first!')
+
+        self.post.title = 'Renamed'
+        self.post.save()
+        self.assertContains(self.client.get(self.url), 'Renamed')
+        self.assertContains(self.client.get(reverse('post-list')), 'Renamed')
+
+        Post.objects.create(author=self.author, title='Another', content='')
+        self.assertContains(self.client.get(reverse('post-list')), 'Another')
+
+    def test_evicted_generations_do_not_revive_old_pages(self):
+        self.client.get(self.url)
+        Comment.objects.create(post=self.post, author=self.reader, content='first!')
+        self.client.get(self.url)
+        names = caching.post_generation(self.post.pk), caching.comments_generation(self.post.pk)
+        cache.delete_many([caching.GENERATION_PREFIX + name for name in names])
+        Comment.objects.create(post=self.post, author=self.reader, content='second!')
+        self.assertContains(self.client.get(self.url), 'second!')
+
+    def test_logged_in_pages_use_fragments_only(self):
+        Comment.objects.create(post=self.post, author=self.reader, content='hello')
+        self.client.get(self.url)
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Edit')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        self.assertFalse([q for q in ctx.captured_queries if 'blog_comment' in q['sql']])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.post = Post.objects.create(author=self.author, title='Tagged', content='body')
+        self.url = reverse('post-detail', args=[self.post.pk])
+
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        # Only the updated_at lookup; the page is neither rendered nor read from cache
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_edits_and_comments_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Comment.objects.create(post=self.post, author=self.author, content='new')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.post.content = 'edited'
+        self.post.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_per_viewer(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(reverse('post-detail', args=[999])).status_code, 404)
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author', password='pass1234')
+        self.post = Post.objects.create(author=self.author, title='Busy', content='body')
+        Comment.objects.bulk_create(
+            [Comment(post=self.post, author=self.author, content=f'comment {i}') for i in range(5000)]
+        )
+        self.url = reverse('post-detail', args=[self.post.pk])
+
+    def test_first_page_costs_three_queries(self):
+        # post + author, the ETag's updated_at, one page of comments + authors
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        comments = response.context['comment_page'].comments
+        self.assertEqual(len(comments), 20)
+        self.assertEqual(comments[0].content, 'comment 0')
+        self.assertEqual(str(comments[0]), 'Comment by author on Busy')
+
+    def test_load_more_walks_the_thread(self):
+        response = self.client.get(self.url, {'limit': 50})
+        cursor = response.context['comment_page'].next_cursor
+        response = self.client.get(self.url, {'after': cursor, 'limit': 50})
+        comments = response.context['comment_page'].comments
+        self.assertEqual([c.content for c in comments[:2]], ['comment 50', 'comment 51'])
+
+    def test_limit_is_capped(self):
+        response = self.client.get(self.url, {'limit': 100000})
+        self.assertEqual(len(response.context['comment_page'].comments), 100)
+        response = self.client.get(self.url, {'limit': 'lots', 'after': 'garbage'})
+        self.assertEqual(len(response.context['comment_page'].comments), 20)
 
-# Create your tests here.
@@ -29,8 +29,12 @@ urlpatterns = [
     path('post/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
     path('post/<int:pk>/update/', PostUpdateView.as_view(), name='post-update'),
     path('post/<int:pk>/delete/', PostDeleteView.as_view(), name='post-delete'),
+    path('user/<str:username>/', views.UserPostListView.as_view(), name='user-posts'),
     
     
+    # Search
+    path('search/', views.search_posts, name='search-posts'),
+
     # 🏷️ Tags
     path('tags/<slug:tag_slug>/', PostByTagListView.as_view(), name='posts-by-tag'),
     # Comment URLs
@@ -1,9 +1,10 @@
+from collections import namedtuple
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
-from django.db.models import Q
 from django.views.generic import (
     ListView,
     DetailView,
@@ -12,44 +13,116 @@ from django.views.generic import (
     DeleteView
 )
 from django.contrib import messages
+from django.core.paginator import Paginator
+from django.utils.functional import SimpleLazyObject
 
-from .models import Post, Comment
-from .forms import RegisterForm, PostForm, CommentForm
-from taggit.models import Tag
+from . import search
+from .caching import (
+    AnonymousPageCacheMixin, ConditionalGetMixin, cache_timeout, comments_generation, generation, post_generation,
+)
+from .models import Post, Comment, Profile, Tag
+from .forms import RegisterForm, PostForm, CommentForm, UserUpdateForm, ProfileUpdateForm
+from .pagination import keyset_page
+from .tagcloud import tag_cloud
 
 
 # --------------------
 # Home
 # --------------------
+POSTS_PER_PAGE = 5
+
+
+def listed_posts():
+    """Posts for list pages: newest first, author joined, content left in the database."""
+    return Post.objects.select_related('author').defer('content').order_by('-published_date', '-id')
+
+
 def home(request):
+    page_obj = Paginator(listed_posts(), POSTS_PER_PAGE).get_page(request.GET.get('page'))
     context = {
-        'posts': Post.objects.all()
+        'posts': page_obj.object_list,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
     }
     return render(request, 'blog/home.html', context)
 
 
-class PostListView(ListView):
+class PostListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/home.html'
     context_object_name = 'posts'
-    ordering = ['-published_date']
-    paginate_by = 5
+    paginate_by = POSTS_PER_PAGE
 
+    def get_queryset(self):
+        return listed_posts()
 
-class UserPostListView(ListView):
+
+class UserPostListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/user_posts.html'
     context_object_name = 'posts'
-    paginate_by = 5
+    paginate_by = POSTS_PER_PAGE
 
     def get_queryset(self):
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
-        return Post.objects.filter(author=user).order_by('-published_date')
+        self.author = get_object_or_404(User, username=self.kwargs.get('username'))
+        return listed_posts().filter(author=self.author)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['author'] = self.author
+        return context
+
 
+COMMENTS_PER_PAGE = 20
+# Upper bound on ?limit=, so no request materializes a whole thread
+MAX_COMMENTS_PER_PAGE = 100
 
-class PostDetailView(DetailView):
+CommentPage = namedtuple('CommentPage', ['comments', 'next_cursor'])
+
+
+class PostDetailView(ConditionalGetMixin, AnonymousPageCacheMixin, DetailView):
     model = Post
 
+    def get_etag_parts(self):
+        # The page shows the post (updated_at) and its comments (generation)
+        updated_at = Post.objects.filter(pk=self.kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None
+        return [updated_at, generation(comments_generation(self.kwargs['pk']))]
+
+    def get_cache_generations(self):
+        return [post_generation(self.kwargs['pk'])]
+
+    def get_queryset(self):
+        return Post.objects.select_related('author')
+
+    def comments_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', COMMENTS_PER_PAGE))
+        except ValueError:
+            limit = COMMENTS_PER_PAGE
+        return max(1, min(limit, MAX_COMMENTS_PER_PAGE))
+
+    def comment_page(self):
+        comments, next_cursor = keyset_page(
+            self.object.comments.select_related('author'),
+            self.request.GET.get('after'),
+            self.comments_limit(),
+            field='created_at',
+            descending=False,
+        )
+        return CommentPage(comments, next_cursor)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Lazy: only queried when the comments fragment is not cached
+        context['comment_page'] = SimpleLazyObject(self.comment_page)
+        context['comments_after'] = self.request.GET.get('after', '')
+        context['comments_limit'] = self.comments_limit()
+        context['comments_version'] = generation(comments_generation(self.object.pk))
+        context['fragment_timeout'] = cache_timeout()
+        return context
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -104,6 +177,32 @@ def add_comment(request, pk):
     return render(request, 'blog/add_comment.html', {'form': form})
 
 
+class CommentCreateView(LoginRequiredMixin, CreateView):
+    model = Comment
+    form_class = CommentForm
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
+        form.instance.post = get_object_or_404(Post, pk=self.kwargs['pk'])
+        messages.success(self.request, "Your comment has been added!")
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return self.object.post.get_absolute_url()
+
+
+class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+    model = Comment
+    form_class = CommentForm
+
+    def get_success_url(self):
+        return self.object.post.get_absolute_url()
+
+    def test_func(self):
+        comment = self.get_object()
+        return self.request.user == comment.author
+
+
 class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     model = Comment
 
@@ -118,36 +217,46 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 # --------------------
 # Search Posts
 # --------------------
+SEARCH_RESULTS_PER_PAGE = 10
+
+
 def search_posts(request):
-    query = request.GET.get('q')
+    query = request.GET.get('q', '').strip()
+    page_obj = None
     results = []
     if query:
-        results = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
+        page_obj = Paginator(search.ranked_post_ids(query), SEARCH_RESULTS_PER_PAGE).get_page(request.GET.get('page'))
+        results = search.load_posts(page_obj.object_list)
     return render(request, 'blog/search_results.html', {
         'query': query,
-        'results': results
+        'results': results,
+        'page_obj': page_obj,
     })
 
 
 # --------------------
 # Posts by Tag
 # --------------------
-class PostByTagListView(ListView):
+class PostByTagListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/posts_by_tag.html'
     context_object_name = 'posts'
+    page_size = 10
 
     def get_queryset(self):
         self.tag = get_object_or_404(Tag, slug=self.kwargs['tag_slug'])
-        return Post.objects.filter(tags__in=[self.tag]).order_by('-published_date')
+        posts, self.next_cursor = keyset_page(
+            self.tag.posts.select_related('author').defer('content').prefetch_related('tags'),
+            self.request.GET.get('cursor'),
+            self.page_size,
+        )
+        return posts
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['tag'] = self.tag
+        context['next_cursor'] = self.next_cursor
+        context['tag_cloud'] = tag_cloud()
         return context
 
 
@@ -156,17 +265,37 @@ class PostByTagListView(ListView):
 # --------------------
 def register(request):
     if request.method == 'POST':
-        form = UserRegisterForm(request.POST)
+        form = RegisterForm(request.POST)
         if form.is_valid():
             user = form.save()
             login(request, user)
             messages.success(request, "Your account has been created! You are now logged in.")
-            return redirect('blog-home')
+            return redirect('home')
     else:
-        form = UserRegisterForm()
+        form = RegisterForm()
     return render(request, 'blog/register.html', {'form': form})
 
 
+# --------------------
+# Profile
+# --------------------
+@login_required
+def profile(request):
+    profile, _ = Profile.objects.get_or_create(user=request.user)
+    if request.method == 'POST':
+        u_form = UserUpdateForm(request.POST, instance=request.user)
+        p_form = ProfileUpdateForm(request.POST, request.FILES, instance=profile)
+        if u_form.is_valid() and p_form.is_valid():
+            u_form.save()
+            p_form.save()
+            messages.success(request, "Your profile has been updated!")
+            return redirect('profile')
+    else:
+        u_form = UserUpdateForm(instance=request.user)
+        p_form = ProfileUpdateForm(instance=profile)
+    return render(request, 'blog/profile.html', {'u_form': u_form, 'p_form': p_form})
+
+
 # --------------------
 # About
 # --------------------
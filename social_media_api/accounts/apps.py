@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Connect the token cache's invalidation receivers in every process,
+        # not only once DRF first loads the authentication class
+        from social_media_api import authentication  # noqa: F401
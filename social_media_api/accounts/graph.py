@@ -0,0 +1,117 @@
+"""
+Follow-graph helpers.
+
+Follow edges live in ``User.following``'s through table; each user also
+stores ``followers_count`` / ``following_count`` so profiles never count
+edges. ``is_following`` answers "does A follow B" from a bounded,
+process-local LRU cache with a TTL, falling back to a primary-key lookup.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+User = get_user_model()
+Follow = User.following.through
+
+
+class LRUCache:
+    """Thread-safe mapping with a size bound and per-entry expiry."""
+
+    def __init__(self, maxsize=100000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+edge_cache = LRUCache(
+    maxsize=getattr(settings, "FOLLOW_CACHE_SIZE", 100000),
+    ttl=getattr(settings, "FOLLOW_CACHE_TTL", 300),
+)
+
+_MISSING = object()
+
+
+def is_following(follower_id, followee_id):
+    key = (follower_id, followee_id)
+    value = edge_cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = Follow.objects.filter(from_user_id=follower_id, to_user_id=followee_id).exists()
+        edge_cache.set(key, value)
+    return value
+
+
+def follow(user, target):
+    """Create the edge and bump both counters; returns False if it already existed."""
+    try:
+        with transaction.atomic():
+            Follow.objects.create(from_user_id=user.pk, to_user_id=target.pk)
+            User.objects.filter(pk=user.pk).update(following_count=F("following_count") + 1)
+            User.objects.filter(pk=target.pk).update(followers_count=F("followers_count") + 1)
+    except IntegrityError:
+        created = False
+    else:
+        created = True
+    edge_cache.set((user.pk, target.pk), True)
+    return created
+
+
+def unfollow(user, target):
+    """Remove the edge and decrement both counters; returns False if there was none."""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(from_user_id=user.pk, to_user_id=target.pk).delete()
+        if deleted:
+            User.objects.filter(pk=user.pk).update(following_count=F("following_count") - 1)
+            User.objects.filter(pk=target.pk).update(followers_count=F("followers_count") - 1)
+    edge_cache.set((user.pk, target.pk), False)
+    return bool(deleted)
+
+
+def _edge_count(column):
+    counts = (
+        Follow.objects.filter(**{column: OuterRef("pk")})
+        .order_by()
+        .values(column)
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recount(queryset=None):
+    """Rewrite stored follower/following counters from the edge table."""
+    queryset = User.objects.all() if queryset is None else queryset
+    return queryset.update(followers_count=_edge_count("to_user"), following_count=_edge_count("from_user"))
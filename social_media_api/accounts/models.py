@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     bio = models.TextField(blank=True, null=True)
@@ -10,8 +12,35 @@ class User(AbstractUser):
         "self",
         symmetrical=False,
         related_name="followers",
-        blank=True
+        blank=True,
+        through="Follow",
     )
+    # Stored edge counts, maintained by accounts.graph.follow/unfollow
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.username
+
+
+class Follow(models.Model):
+    """A follow edge: ``from_user`` follows ``to_user`` since ``created``."""
+    from_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="following_edges")
+    to_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="follower_edges")
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Keeps the table of the former auto-created through model
+        db_table = "accounts_user_following"
+        unique_together = ("from_user", "to_user")
+        indexes = [
+            models.Index(fields=["from_user", "-created", "-id"], name="follow_following_idx"),
+            models.Index(fields=["to_user", "-created", "-id"], name="follow_followers_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.from_user_id} follows {self.to_user_id}"
+
+
+# Alias used by the accounts views
+CustomUser = User
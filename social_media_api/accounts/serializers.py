@@ -2,13 +2,64 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
 
+from . import graph
+from .models import Follow
+
 User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
+    # Stored counters instead of the full follower id list; the ids are
+    # available page by page from the followers endpoint
+    is_following = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            "id", "username", "email", "bio", "profile_picture",
+            "followers_count", "following_count", "is_following",
+        ]
+        read_only_fields = ["followers_count", "following_count"]
+
+    def get_is_following(self, obj):
+        """Whether the requesting user follows ``obj`` (None when anonymous or self)."""
+        request = self.context.get("request")
+        if not request or not request.user.is_authenticated or request.user.pk == obj.pk:
+            return None
+        return graph.is_following(request.user.pk, obj.pk)
+
+    def update(self, instance, validated_data):
+        # Save only the edited columns: the counters are maintained with F()
+        # updates and a full-row save would overwrite concurrent changes
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Slim user row for follow lists: no nested relations."""
     class Meta:
         model = User
-        fields = ["id", "username", "email", "bio", "profile_picture", "followers"]
+        fields = ["id", "username", "profile_picture", "followers_count"]
+
+
+class FollowingSerializer(serializers.ModelSerializer):
+    user = UserSummarySerializer(source="to_user", read_only=True)
+    followed_at = serializers.DateTimeField(source="created", read_only=True)
+
+    class Meta:
+        model = Follow
+        fields = ["user", "followed_at"]
+
+
+class FollowerSerializer(serializers.ModelSerializer):
+    user = UserSummarySerializer(source="from_user", read_only=True)
+    followed_at = serializers.DateTimeField(source="created", read_only=True)
+
+    class Meta:
+        model = Follow
+        fields = ["user", "followed_at"]
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -26,6 +77,6 @@ class RegisterSerializer(serializers.ModelSerializer):
             email=validated_data.get("email", ""),
             password=validated_data["password"],
         )
-        # Auto-generate a token for new user
+        # Auto-generate a token for new user (also caches it as user.auth_token)
         Token.objects.create(user=user)
         return user
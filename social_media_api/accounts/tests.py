@@ -1,3 +1,196 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from social_media_api.authentication import stats, token_cache
+from . import graph
+from .serializers import UserSerializer
+
+User = get_user_model()
+
+API_SETTINGS = dict(SECURE_SSL_REDIRECT=False, NOTIFICATION_BACKEND="notifications.pipeline.InlineBackend")
+
+
+@override_settings(**API_SETTINGS)
+class FollowGraphTests(TestCase):
+    def setUp(self):
+        graph.edge_cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="pass1234")
+        self.bob = User.objects.create_user(username="bob", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return user.followers_count, user.following_count
+
+    def test_follow_and_unfollow_keep_counters_exact(self):
+        url = reverse("follow-user", args=[self.bob.id])
+        self.client.post(url)
+        self.client.post(url)  # idempotent
+        self.assertEqual(self.counts(self.bob), (1, 0))
+        self.assertEqual(self.counts(self.alice), (0, 1))
+
+        unfollow = reverse("unfollow-user", args=[self.bob.id])
+        self.client.post(unfollow)
+        self.client.post(unfollow)
+        self.assertEqual(self.counts(self.bob), (0, 0))
+        self.assertEqual(self.counts(self.alice), (0, 0))
+
+    def test_membership_is_cached(self):
+        self.assertFalse(graph.is_following(self.alice.id, self.bob.id))
+        with self.assertNumQueries(0):
+            self.assertFalse(graph.is_following(self.alice.id, self.bob.id))
+        graph.follow(self.alice, self.bob)
+        with self.assertNumQueries(0):
+            self.assertTrue(graph.is_following(self.alice.id, self.bob.id))
+
+    def test_lru_evicts_oldest(self):
+        cache = graph.LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_profile_update_leaves_counters_alone(self):
+        stale = User.objects.get(pk=self.alice.pk)
+        graph.follow(self.alice, self.bob)
+        serializer = UserSerializer(stale, data={"bio": "hi", "following_count": 7}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        self.assertNotIn("following_count", ctx.captured_queries[-1]["sql"])
+        self.assertEqual(self.counts(self.alice), (0, 1))
+        self.assertEqual(self.alice.bio, "hi")
+
+    def test_profile_serializes_counts_not_ids(self):
+        graph.follow(self.alice, self.bob)
+        data = self.client.get(reverse("user-detail", args=[self.bob.id])).data
+        self.assertNotIn("followers", data)
+        self.assertEqual(data["followers_count"], 1)
+        self.assertTrue(data["is_following"])
+
+
+
+@override_settings(**API_SETTINGS)
+class FollowListTests(TestCase):
+    def setUp(self):
+        self.star = User.objects.create_user(username="star", password="pass1234")
+        self.fans = [User.objects.create_user(username=f"fan{i}", password="pass1234") for i in range(25)]
+        for fan in self.fans:
+            graph.follow(fan, self.star)
+            graph.follow(self.star, fan)
+        self.client = APIClient()
+        self.client.force_authenticate(self.star)
+
+    def walk(self, url):
+        names, query_counts = [], set()
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(url).data
+            query_counts.add(len(ctx.captured_queries))
+            names += [row["user"]["username"] for row in data["results"]]
+            url = data["next"]
+        return names, query_counts
+
+    def test_followers_and_following_walk_newest_first_in_one_query_per_page(self):
+        newest_first = [fan.username for fan in reversed(self.fans)]
+        for name in ("followers-list", "following-list"):
+            names, query_counts = self.walk(reverse(name) + "?page_size=7")
+            self.assertEqual(names, newest_first)
+            self.assertEqual(query_counts, {1})
+
+    def test_rows_are_slim(self):
+        row = self.client.get(reverse("user-followers", args=[self.star.id])).data["results"][0]
+        self.assertEqual(set(row), {"user", "followed_at"})
+        self.assertEqual(set(row["user"]), {"id", "username", "profile_picture", "followers_count"})
+
+    def test_followers_of_unknown_user_is_404(self):
+        response = self.client.get(reverse("user-followers", args=[self.fans[-1].id + 1000]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(**API_SETTINGS)
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache().clear()
+        stats.clear()
+        cache.clear()
+        self.user = User.objects.create_user(username="carol", password="pass1234")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("notifications-unread-count")
+
+    def test_warm_requests_run_no_queries(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_profile_edit_keeps_counters_updated_behind_the_cache(self):
+        self.client.get(self.url)
+        dave = User.objects.create_user(username="dave", password="pass1234")
+        graph.follow(self.user, dave)
+        response = self.client.patch(reverse("profile"), {"bio": "hello"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["following_count"], 1)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.bio, self.user.following_count), ("hello", 1))
+
+    def test_expired_entries_are_refetched(self):
+        tokens = {**settings.CACHES["tokens"], "TIMEOUT": 0}
+        with override_settings(CACHES={**settings.CACHES, "tokens": tokens}):
+            self.client.get(self.url)
+            self.client.get(self.url)
+        self.assertEqual(stats["misses"], 2)
+
+
+@override_settings(**API_SETTINGS, PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthFlowTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_register_returns_token_without_refetching(self):
+        payload = {"username": "dave", "email": "dave@example.com", "password": "pass1234"}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("register"), payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["token"], Token.objects.get(user__username="dave").key)
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 1)  # the username uniqueness check
+
+    def test_register_is_atomic(self):
+        with mock.patch("accounts.serializers.Token.objects.create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse("register"), {"username": "frank", "password": "pass1234"})
+        self.assertFalse(User.objects.filter(username="frank").exists())
+
+    def test_login_uses_objects_in_hand(self):
+        user = User.objects.create_user(username="erin", password="pass1234")
+        token = Token.objects.create(user=user)
+        with self.assertNumQueries(2):  # user lookup + token get_or_create
+            response = self.client.post(reverse("login"), {"username": "erin", "password": "pass1234"})
+        self.assertEqual(response.data, {"token": token.key, "user_id": user.id, "username": "erin"})
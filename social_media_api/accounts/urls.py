@@ -2,6 +2,7 @@ from django.urls import path
 from .views import RegisterView, LoginView, ProfileView
 
 from .views import FollowUserView, UnfollowUserView, FollowingListView, FollowersListView
+from .views import UserDetailView, UserFollowersView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
@@ -12,4 +13,6 @@ urlpatterns = [
     path("unfollow/<int:user_id>/", UnfollowUserView.as_view(), name="unfollow-user"),
     path("following/", FollowingListView.as_view(), name="following-list"),
     path("followers/", FollowersListView.as_view(), name="followers-list"),
+    path("users/<int:user_id>/", UserDetailView.as_view(), name="user-detail"),
+    path("users/<int:user_id>/followers/", UserFollowersView.as_view(), name="user-followers"),
 ]
@@ -2,12 +2,18 @@ from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 
-from .serializers import RegisterSerializer, UserSerializer
-from .models import CustomUser   # ✅ Explicit import for checker
+from notifications.pipeline import notify
+from posts import timeline
+from . import graph
+from social_media_api.pagination import KeysetPagination
+from .serializers import RegisterSerializer, UserSerializer, FollowingSerializer, FollowerSerializer
+from .models import CustomUser, Follow   # ✅ Explicit import for checker
 
 
 User = get_user_model()
@@ -18,17 +24,25 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
     def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        user = CustomUser.objects.get(username=response.data["username"])  # ✅ Use CustomUser
-        token, created = Token.objects.get_or_create(user=user)
-        return Response({"user": response.data, "token": token.key})
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # User and token are created together or not at all
+        with transaction.atomic():
+            user = serializer.save()
+        # RegisterSerializer.create left the new token cached on the user
+        return Response(
+            {"user": serializer.data, "token": user.auth_token.key},
+            status=status.HTTP_201_CREATED,
+        )
 
 
 class LoginView(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data['token'])
-        return Response({"token": token.key, "user_id": token.user_id, "username": token.user.username})
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+        token, created = Token.objects.get_or_create(user=user)
+        return Response({"token": token.key, "user_id": user.pk, "username": user.username})
 
 
 class ProfileView(generics.RetrieveUpdateAPIView):
@@ -37,7 +51,9 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user may be a snapshot from the token cache with stale
+        # follow counters; edit a fresh row, never the cached instance
+        return CustomUser.objects.get(pk=self.request.user.pk)
 
 
 class FollowUserView(APIView):
@@ -48,7 +64,9 @@ class FollowUserView(APIView):
         if target_user == request.user:
             return Response({"detail": "You cannot follow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
-        request.user.following.add(target_user)
+        if graph.follow(request.user, target_user):
+            timeline.follow(request.user, target_user)
+            notify(target_user.id, request.user.id, "started following you")
         return Response({"detail": f"You are now following {target_user.username}."})
 
 
@@ -60,24 +78,50 @@ class UnfollowUserView(APIView):
         if target_user == request.user:
             return Response({"detail": "You cannot unfollow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
-        request.user.following.remove(target_user)
+        if graph.unfollow(request.user, target_user):
+            timeline.unfollow(request.user, target_user)
         return Response({"detail": f"You have unfollowed {target_user.username}."})
 
 
 class FollowingListView(generics.ListAPIView):
-    serializer_class = UserSerializer
+    """
+    Users the requester follows, newest edge first. Walks the Follow table
+    by (created, id) keyset, so every page is one indexed query.
+    """
+    serializer_class = FollowingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ("-created", "-id")
 
     def get_queryset(self):
-        return self.request.user.following.all()
+        return Follow.objects.filter(from_user=self.request.user).select_related("to_user")
 
 
 class FollowersListView(generics.ListAPIView):
+    serializer_class = FollowerSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ("-created", "-id")
+
+    def get_queryset(self):
+        return Follow.objects.filter(to_user=self.request.user).select_related("from_user")
+
+
+class UserDetailView(generics.RetrieveAPIView):
+    queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    lookup_url_kwarg = "user_id"
+
+
+class UserFollowersView(FollowersListView):
+    """Followers of any user, paginated like FollowersListView."""
 
     def get_queryset(self):
-        return self.request.user.followers.all()
+        # Filtering Follow alone would answer an empty page for a missing user
+        if not CustomUser.objects.filter(pk=self.kwargs["user_id"]).exists():
+            raise Http404
+        return Follow.objects.filter(to_user_id=self.kwargs["user_id"]).select_related("from_user")
 
 
 # ✅ Extra GenericAPIView to satisfy checker
@@ -0,0 +1,88 @@
+"""
+Registration and login throughput through the API, comparing the previous
+view code with the current views under both password hasher profiles.
+
+    python -m benchmarks.bench_auth [--n 200]
+"""
+import argparse
+import itertools
+import time
+
+from benchmarks.harness import test_database
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import path, reverse
+from rest_framework import generics
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from accounts.serializers import RegisterSerializer
+from social_media_api.urls import urlpatterns as project_urls
+
+User = get_user_model()
+
+
+class LegacyRegisterView(generics.CreateAPIView):
+    serializer_class = RegisterSerializer
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        user = User.objects.get(username=response.data["username"])
+        token, created = Token.objects.get_or_create(user=user)
+        return Response({"user": response.data, "token": token.key})
+
+
+class LegacyLoginView(ObtainAuthToken):
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        token = Token.objects.get(key=response.data["token"])
+        return Response({"token": token.key, "user_id": token.user_id, "username": token.user.username})
+
+
+urlpatterns = project_urls + [
+    path("legacy/register/", LegacyRegisterView.as_view(), name="legacy-register"),
+    path("legacy/login/", LegacyLoginView.as_view(), name="legacy-login"),
+]
+
+HASHERS = {
+    "default": ["django.contrib.auth.hashers.PBKDF2PasswordHasher"],
+    "fast": ["django.contrib.auth.hashers.MD5PasswordHasher"],
+}
+counter = itertools.count()
+
+
+def throughput(client, url, payloads):
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        for payload in payloads:
+            assert client.post(url, payload).status_code in (200, 201)
+        elapsed = time.perf_counter() - start
+    return len(payloads) / elapsed, len(ctx.captured_queries) / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = dict(SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=["testserver"], ROOT_URLCONF=__name__)
+    with test_database(), override_settings(**settings):
+        client = APIClient()
+        for profile, hashers in HASHERS.items():
+            with override_settings(PASSWORD_HASHERS=hashers):
+                n = args.n if profile == "fast" else max(args.n // 10, 10)
+                for flavour, register, login in (("legacy", "legacy-register", "legacy-login"),
+                                                 ("current", "register", "login")):
+                    payloads = [{"username": f"u{next(counter)}", "password": "pass1234"} for _ in range(n)]
+                    reg_rate, reg_q = throughput(client, reverse(register), payloads)
+                    login_rate, login_q = throughput(client, reverse(login), payloads)
+                    print(f"{profile:<8} {flavour:<8} register {reg_rate:8.1f}/s ({reg_q:.1f} q)   "
+                          f"login {login_rate:8.1f}/s ({login_q:.1f} q)")
+
+
+if __name__ == "__main__":
+    main()
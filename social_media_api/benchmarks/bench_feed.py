@@ -0,0 +1,82 @@
+"""
+Feed latency: legacy fan-out-on-read query vs the precomputed timeline.
+
+    python -m benchmarks.bench_feed [--authors 2000] [--posts-per-author 5]
+"""
+import argparse
+import random
+from io import StringIO
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from posts import timeline
+from posts.models import Post
+from posts.serializers import PostSerializer
+
+User = get_user_model()
+
+
+def seed(authors, posts_per_author, readers):
+    User.objects.bulk_create(
+        [User(username=f"user{i}", password="!") for i in range(authors + readers)],
+        batch_size=1000,
+    )
+    users = list(User.objects.order_by("id"))
+    author_users, reader_users = users[:authors], users[authors:]
+    Post.objects.bulk_create(
+        [
+            Post(author=author, title=f"{author.username} #{n}", content="lorem ipsum " * 20)
+            for author in author_users
+            for n in range(posts_per_author)
+        ],
+        batch_size=1000,
+    )
+    Follow = User.following.through
+    rng = random.Random(42)
+    Follow.objects.bulk_create(
+        [
+            Follow(from_user_id=reader.id, to_user_id=author.id)
+            for reader in reader_users
+            for author in rng.sample(author_users, len(author_users) // 2)
+        ],
+        batch_size=1000,
+    )
+    return reader_users
+
+
+def legacy_feed(user):
+    posts = Post.objects.filter(author__in=user.following.all()).order_by("-created_at")
+    return PostSerializer(posts, many=True).data
+
+
+def timeline_feed(user, limit=10):
+    posts, _ = timeline.read_timeline(user, limit=limit)
+    return PostSerializer(posts, many=True).data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=2000)
+    parser.add_argument("--posts-per-author", type=int, default=5)
+    parser.add_argument("--readers", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with test_database():
+        readers = seed(args.authors, args.posts_per_author, args.readers)
+        call_command("backfill_timelines", stdout=StringIO())
+        reader = readers[0]
+        print(f"reader follows {reader.following.count()} authors, "
+              f"{Post.objects.filter(author__in=reader.following.all()).count()} candidate posts")
+
+        report("legacy feed (full, unpaginated)", measure(lambda: legacy_feed(reader), repeat=args.repeat),
+               count_queries(lambda: legacy_feed(reader)))
+        report("timeline feed (page of 10)", measure(lambda: timeline_feed(reader), repeat=args.repeat),
+               count_queries(lambda: timeline_feed(reader)))
+
+
+if __name__ == "__main__":
+    main()
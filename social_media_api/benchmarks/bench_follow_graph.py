@@ -0,0 +1,81 @@
+"""
+Follow-graph reads on a synthetic power-law graph: profile serialization
+with the full follower id list vs stored counters, and "does A follow B"
+via the database vs the LRU edge cache.
+
+    python -m benchmarks.bench_follow_graph [--users 5000] [--follows-per-user 20]
+"""
+import argparse
+import random
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+from accounts import graph
+from accounts.serializers import UserSerializer
+
+User = get_user_model()
+Follow = User.following.through
+
+
+class LegacyUserSerializer(serializers.ModelSerializer):
+    """The pre-counter profile shape: every follower id inline."""
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "bio", "profile_picture", "followers"]
+
+
+def seed(users, follows_per_user, alpha):
+    User.objects.bulk_create([User(username=f"user{i}", password="!") for i in range(users)], batch_size=1000)
+    ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    rng = random.Random(7)
+    # Zipf-like popularity: the k-th user is followed with weight 1 / k**alpha
+    weights = [1 / (rank + 1) ** alpha for rank in range(users)]
+    edges = set()
+    for follower in ids:
+        for followee in rng.choices(ids, weights=weights, k=follows_per_user):
+            if followee != follower:
+                edges.add((follower, followee))
+    Follow.objects.bulk_create([Follow(from_user_id=a, to_user_id=b) for a, b in edges], batch_size=5000)
+    graph.recount()
+    return ids, sorted(edges)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--follows-per-user", type=int, default=20)
+    parser.add_argument("--alpha", type=float, default=1.1)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with test_database():
+        ids, edges = seed(args.users, args.follows_per_user, args.alpha)
+        celebrity = User.objects.get(pk=ids[0])
+        print(f"{len(edges)} edges; most-followed user has {Follow.objects.filter(to_user=celebrity).count()} followers")
+
+        report("legacy profile (id list)", measure(lambda: LegacyUserSerializer(celebrity).data, repeat=args.repeat),
+               count_queries(lambda: LegacyUserSerializer(celebrity).data))
+        report("profile with counters", measure(lambda: UserSerializer(celebrity).data, repeat=args.repeat),
+               count_queries(lambda: UserSerializer(celebrity).data))
+
+        rng = random.Random(3)
+        sample = [rng.choice(edges) if i % 2 else (rng.choice(ids), rng.choice(ids)) for i in range(1000)]
+
+        def db_lookups():
+            for a, b in sample:
+                Follow.objects.filter(from_user_id=a, to_user_id=b).exists()
+
+        def cached_lookups():
+            for a, b in sample:
+                graph.is_following(a, b)
+
+        graph.edge_cache.clear()
+        report("1000 membership checks (DB)", measure(db_lookups, repeat=5))
+        report("1000 membership checks (LRU)", measure(cached_lookups, repeat=5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Like-storm throughput: synchronous Notification rows vs the coalescing pipeline.
+
+    python -m benchmarks.bench_notifications [--likes 5000] [--batch-size 500]
+"""
+import argparse
+import time
+
+from benchmarks.harness import test_database
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.pipeline import Event, QueueBackend
+from posts.models import Post
+
+User = get_user_model()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--likes", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with test_database():
+        User.objects.bulk_create([User(username=f"user{i}", password="!") for i in range(args.likes + 1)])
+        author, *fans = User.objects.order_by("id")
+        post = Post.objects.create(author=author, title="viral")
+        content_type = ContentType.objects.get_for_model(Post)
+
+        start = time.perf_counter()
+        for fan in fans:
+            Notification.objects.create(recipient=author, actor=fan, verb="liked your post", target=post)
+        sync_elapsed = time.perf_counter() - start
+        sync_rows = Notification.objects.count()
+        Notification.objects.all().delete()
+
+        backend = QueueBackend()
+        backend.batch_size = args.batch_size
+        start = time.perf_counter()
+        for fan in fans:
+            backend.enqueue(Event(author.id, fan.id, "liked your post", content_type.id, post.id, timezone.now()))
+        enqueue_elapsed = time.perf_counter() - start
+        backend.flush()
+        pipeline_elapsed = time.perf_counter() - start
+
+        print(f"synchronous create   {args.likes / sync_elapsed:12.0f} likes/s   rows={sync_rows}")
+        print(f"pipeline enqueue     {args.likes / enqueue_elapsed:12.0f} likes/s   (request path)")
+        print(f"pipeline end-to-end  {args.likes / pipeline_elapsed:12.0f} likes/s   "
+              f"rows={Notification.objects.count()}  actor_count={Notification.objects.get().actor_count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+PostViewSet.list latency with the response cache off and on.
+
+    python -m benchmarks.bench_response_cache [--rows 2000] [--repeat 200]
+
+Seeds ``--rows`` posts, then reads the first page (default and page_size=50)
+as one authenticated user, first with RESPONSE_CACHE_TIMEOUT=0 and then with
+the cache on.
+"""
+import argparse
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from posts.models import Post
+
+
+def seed(rows, user):
+    Post.objects.bulk_create(
+        [Post(author=user, title=f"Post {i}", content="Lorem ipsum dolor sit amet. " * 20) for i in range(rows)],
+        batch_size=1000,
+    )
+    return [reverse("post-list"), reverse("post-list") + "?page_size=50"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with test_database():
+        user = get_user_model().objects.create_user(username="bench", password="bench1234")
+        urls = seed(args.rows, user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for url in urls:
+            for label, timeout in (("uncached", 0), ("cached", 60)):
+                with override_settings(RESPONSE_CACHE_TIMEOUT=timeout):
+                    def fn():
+                        response = client.get(url, secure=True)
+                        assert response.status_code == 200, response.status_code
+
+                    samples = measure(fn, repeat=args.repeat)
+                    report(f"{label} {url}", samples, count_queries(fn))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Post search latency: SearchFilter-style LIKE scans vs the full-text index.
+
+    python -m benchmarks.bench_search [--posts 1000000] [--repeat 10]
+
+Each query is timed as the list endpoint runs it: the first page of 10
+results plus the COUNT(*) for pagination. Seeding 1M posts takes a few
+minutes (the FTS triggers index every row as it is inserted); pass a
+smaller ``--posts`` for a quick run.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts.models import Post
+from posts.search import LikeSearchBackend, get_backend, search_terms
+
+User = get_user_model()
+
+VOCABULARY_SIZE = 20000
+
+
+def make_vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def seed(posts, batch_size=10000):
+    rng = random.Random(42)
+    words = make_vocabulary(rng)
+    # Zipf-like frequencies so there are very common and very rare terms
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    cum_weights = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cum_weights.append(total)
+
+    author = User.objects.create(username="author", password="!")
+    now = timezone.now()
+    table = Post._meta.db_table
+    sql = (
+        f"INSERT INTO {table} (author_id, title, content, created_at, updated_at, likes_count, comments_count) "
+        "VALUES (%s, %s, %s, %s, %s, 0, 0)"
+    )
+    start = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, posts, batch_size):
+            rows = []
+            for _ in range(min(batch_size, posts - offset)):
+                title = " ".join(rng.choices(words, cum_weights=cum_weights, k=6))
+                content = " ".join(rng.choices(words, cum_weights=cum_weights, k=40))
+                rows.append((author.id, title, content, now, now))
+            cursor.executemany(sql, rows)
+    print(f"seeded {posts} posts in {time.perf_counter() - start:.1f}s")
+    return words
+
+
+def words_at(words, rank):
+    # make_vocabulary() sorts alphabetically, so frequency rank is position in the list
+    return words[rank]
+
+
+def first_page(queryset):
+    return list(queryset[:10]), queryset.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with test_database():
+        words = seed(args.posts)
+        queries = {
+            "common term": words_at(words, 0),
+            "mid-frequency term": words_at(words, 200),
+            "rare term": words_at(words, 15000),
+            "two terms": f"{words_at(words, 3)} {words_at(words, 50)}",
+            "prefix": words_at(words, 100)[:3],
+        }
+        fts = get_backend()
+        like = LikeSearchBackend()
+        print(f"full-text backend: {type(fts).__name__}")
+        base = Post.objects.all()
+        for label, text in queries.items():
+            terms = search_terms(text)
+            _, matches = first_page(fts.search(base, terms))
+            print(f"\n{label} {text!r}: {matches} matches")
+            report("  LIKE '%term%'", measure(lambda: first_page(like.search(base, terms)),
+                                              repeat=args.repeat, warmup=1))
+            report("  full-text", measure(lambda: first_page(fts.search(base, terms)),
+                                          repeat=args.repeat, warmup=1))
+
+
+if __name__ == "__main__":
+    main()
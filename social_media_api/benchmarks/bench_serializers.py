@@ -0,0 +1,87 @@
+"""
+Time to fetch, serialize and render 1,000 rows, per serializer path.
+
+    python -m benchmarks.bench_serializers [--rows 1000] [--repeat 30]
+
+For PostSerializer and NotificationSerializer it compares:
+
+* model instances + ModelSerializer, rendered by DRF's JSONRenderer (the old path);
+* the same, rendered by ORJSONRenderer;
+* ``.values()`` rows through ValuesSerializerMixin, rendered by ORJSONRenderer;
+* the same, rendered by MessagePackRenderer (when msgpack is installed).
+"""
+import argparse
+
+from benchmarks.harness import count_queries, measure, report, test_database
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from rest_framework.renderers import JSONRenderer
+
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+from posts.models import Comment, Post
+from posts.serializers import PostSerializer
+from social_media_api import renderers
+
+
+def seed(rows):
+    User = get_user_model()
+    users = User.objects.bulk_create([User(username=f"user{i}", password="!") for i in range(20)])
+    posts = Post.objects.bulk_create(
+        [Post(author=users[i % 20], title=f"Post {i}", content="Lorem ipsum dolor sit amet. " * 10) for i in range(rows)]
+    )
+    Notification.objects.bulk_create(
+        [
+            Notification(recipient=users[0], actor=users[i % 20], verb="liked your post", target=posts[i], actor_count=i % 4 + 1)
+            for i in range(rows)
+        ]
+    )
+    notifications = (
+        Notification.objects.select_related("actor")
+        .prefetch_related(GenericPrefetch("target", [Post.objects.all(), Comment.objects.all()]))
+    )
+    return [
+        ("PostSerializer", Post.objects.select_related("author").order_by("-id"), PostSerializer),
+        ("NotificationSerializer", notifications, NotificationSerializer),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    json_renderer, orjson_renderer = JSONRenderer(), renderers.ORJSONRenderer()
+    msgpack_renderer = renderers.MessagePackRenderer() if renderers.msgpack else None
+
+    with test_database():
+        for name, queryset, serializer_class in seed(args.rows):
+
+            def instances():
+                return serializer_class(queryset[: args.rows], many=True).data
+
+            def values():
+                serializer = serializer_class()
+                rows = queryset.prefetch_related(None).values(*serializer.values_lookups())[: args.rows]
+                return serializer.values_representation(rows)
+
+            paths = [
+                ("instances + JSONRenderer", instances, json_renderer),
+                ("instances + ORJSONRenderer", instances, orjson_renderer),
+                ("values + ORJSONRenderer", values, orjson_renderer),
+            ]
+            if msgpack_renderer:
+                paths.append(("values + MessagePackRenderer", values, msgpack_renderer))
+
+            print(f"{name}, {args.rows} rows")
+            for label, build, renderer in paths:
+                def fn():
+                    renderer.render(build())
+
+                report(f"  {label}", measure(fn, repeat=args.repeat), count_queries(fn))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Token-authenticated load: DB queries and latency per request with the token
+cache cold vs warm, against the (cached) unread-count badge endpoint.
+
+    python -m benchmarks.bench_token_auth [--users 200] [--requests 2000]
+"""
+import argparse
+import random
+
+from benchmarks.harness import measure, report, test_database
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from social_media_api.authentication import stats, token_cache
+
+User = get_user_model()
+
+
+def run(clients, url, requests, rng):
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(requests):
+            rng.choice(clients).get(url)
+    return len(ctx.captured_queries) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with test_database(), override_settings(SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=["testserver"]):
+        User.objects.bulk_create([User(username=f"user{i}", password="!") for i in range(args.users)])
+        clients = []
+        for user in User.objects.all():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+            clients.append(client)
+        url = reverse("notifications-unread-count")
+        rng = random.Random(1)
+
+        no_cache = {**settings.CACHES, "tokens": {**settings.CACHES["tokens"], "TIMEOUT": 0}}
+        with override_settings(CACHES=no_cache):
+            cold = run(clients, url, args.requests, rng)
+            report("cache disabled (timeout=0)", measure(lambda: rng.choice(clients).get(url), repeat=200))
+        token_cache().clear()
+        stats.clear()
+        for client in clients:
+            client.get(url)  # warm every token once
+        warm = run(clients, url, args.requests, rng)
+        report("warm token cache", measure(lambda: rng.choice(clients).get(url), repeat=200))
+
+        print(f"queries/request: cold={cold:.2f} warm={warm:.2f}; "
+              f"hit ratio={stats['hits'] / max(stats['hits'] + stats['misses'], 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
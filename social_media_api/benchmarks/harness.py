@@ -0,0 +1,66 @@
+"""
+Shared helpers for the scripts in this directory.
+
+Benchmarks run against a throwaway test database created next to the
+project's own, so they never touch db.sqlite3. Run them from the project
+root, e.g. ``python -m benchmarks.bench_feed``.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "social_media_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+@contextmanager
+def test_database():
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(fn, repeat=50, warmup=3):
+    """Run ``fn`` repeatedly and return the samples in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def count_queries(fn):
+    with CaptureQueriesContext(connection) as ctx:
+        fn()
+    return len(ctx.captured_queries)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def report(label, samples, queries=None):
+    line = (
+        f"{label:<32} p50={percentile(samples, 50):8.2f}ms  "
+        f"p99={percentile(samples, 99):8.2f}ms  mean={statistics.mean(samples):8.2f}ms"
+    )
+    if queries is not None:
+        line += f"  queries={queries}"
+    print(line)
@@ -16,9 +16,28 @@ class Notification(models.Model):
     
     timestamp = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+    # Number of coalesced events; `actor` is the most recent one
+    actor_count = models.PositiveIntegerField(default=1)
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["recipient", "-timestamp", "-id"], name="notification_inbox_idx"),
+            models.Index(fields=["recipient", "read", "-timestamp"], name="notification_unread_idx"),
+        ]
 
     def __str__(self):
         return f"Notification for {self.recipient} - {self.verb}"
+
+    @property
+    def summary(self):
+        """e.g. "alice and 312 others liked your post"."""
+        return format_summary(self.actor.username, self.actor_count, self.verb)
+
+
+def format_summary(username, actor_count, verb):
+    others = actor_count - 1
+    if others <= 0:
+        return f"{username} {verb}"
+    noun = "other" if others == 1 else "others"
+    return f"{username} and {others} {noun} {verb}"
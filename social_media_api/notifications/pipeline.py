@@ -0,0 +1,196 @@
+"""
+Asynchronous, coalescing notification delivery.
+
+Views call :func:`notify`, which only appends an event to an in-process
+queue. A backend drains the queue in batches and folds repeated
+``(recipient, verb, target)`` events into one row per window, so a viral
+post produces "alice and 312 others liked your post" instead of 313 rows.
+
+Backends are selected with the ``NOTIFICATION_BACKEND`` setting:
+
+* ``notifications.pipeline.ThreadedQueueBackend`` (default) flushes from a
+  daemon worker thread every ``NOTIFICATION_FLUSH_INTERVAL`` seconds or
+  once ``NOTIFICATION_BATCH_SIZE`` events are waiting.
+* ``notifications.pipeline.InlineBackend`` flushes on every enqueue; use it
+  in tests and management commands.
+"""
+import atexit
+import logging
+import queue
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import unread
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple("Event", ["recipient_id", "actor_id", "verb", "content_type_id", "object_id", "timestamp"])
+
+
+def coalesce_window():
+    return timedelta(seconds=getattr(settings, "NOTIFICATION_COALESCE_WINDOW", 3600))
+
+
+def coalesce_key(recipient_id, verb, content_type_id, object_id):
+    return (recipient_id, verb, content_type_id, object_id)
+
+
+def write_events(events):
+    """
+    Persist a batch of events, merging them into unread notifications for
+    the same key created within the coalescing window. Returns the number of
+    rows created and updated.
+    """
+    groups = {}
+    for event in events:
+        key = coalesce_key(event.recipient_id, event.verb, event.content_type_id, event.object_id)
+        count, _, _ = groups.get(key, (0, None, None))
+        # The most recent actor is the one named in the aggregated row
+        groups[key] = (count + 1, event.actor_id, event.timestamp)
+    if not groups:
+        return 0, 0
+
+    since = timezone.now() - coalesce_window()
+    candidates = Notification.objects.filter(
+        recipient_id__in={key[0] for key in groups},
+        verb__in={key[1] for key in groups},
+        read=False,
+        timestamp__gte=since,
+    ).order_by("timestamp")
+    existing = {
+        coalesce_key(n.recipient_id, n.verb, n.content_type_id, n.object_id): n
+        for n in candidates
+    }
+
+    to_create, to_update = [], []
+    for key, (count, actor_id, timestamp) in groups.items():
+        notification = existing.get(key)
+        if notification is None:
+            recipient_id, verb, content_type_id, object_id = key
+            to_create.append(Notification(
+                recipient_id=recipient_id, actor_id=actor_id, verb=verb,
+                content_type_id=content_type_id, object_id=object_id, actor_count=count,
+            ))
+        else:
+            notification.actor_id = actor_id
+            notification.actor_count += count
+            notification.timestamp = timestamp
+            to_update.append(notification)
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(to_create)
+        Notification.objects.bulk_update(to_update, ["actor", "actor_count", "timestamp"])
+        # Merged rows were already unread, so only new rows move the badge
+        recipients = {n.recipient_id for n in to_create}
+        transaction.on_commit(lambda: unread.invalidate(*recipients))
+    return len(to_create), len(to_update)
+
+
+class QueueBackend:
+    """Buffers events in a thread-safe queue; ``flush()`` drains it."""
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.batch_size = getattr(settings, "NOTIFICATION_BATCH_SIZE", 500)
+
+    def enqueue(self, event):
+        self.queue.put(event)
+
+    def drain(self):
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def flush(self):
+        """Write everything queued so far; returns the number of events written."""
+        written = 0
+        while True:
+            events = self.drain()
+            if not events:
+                return written
+            write_events(events)
+            written += len(events)
+
+
+class InlineBackend(QueueBackend):
+    def enqueue(self, event):
+        super().enqueue(event)
+        self.flush()
+
+
+class ThreadedQueueBackend(QueueBackend):
+    def __init__(self):
+        super().__init__()
+        self.interval = getattr(settings, "NOTIFICATION_FLUSH_INTERVAL", 0.5)
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def enqueue(self, event):
+        super().enqueue(event)
+        self.start()
+        if self.queue.qsize() >= self.batch_size:
+            self.wakeup.set()
+
+    def start(self):
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name="notification-worker", daemon=True)
+                self.worker.start()
+                atexit.register(self.stop)
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+        if self.worker is not None:
+            self.worker.join(timeout=5)
+        self.flush()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush notifications")
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _load_backend(getattr(settings, "NOTIFICATION_BACKEND", "notifications.pipeline.ThreadedQueueBackend"))
+
+
+def notify(recipient_id, actor_id, verb, target=None):
+    """Queue a notification; the request pays for an append and nothing else."""
+    content_type_id = object_id = None
+    if target is not None:
+        content_type_id = ContentType.objects.get_for_model(target).pk
+        object_id = target.pk
+    get_backend().enqueue(Event(
+        recipient_id=recipient_id,
+        actor_id=actor_id,
+        verb=verb,
+        content_type_id=content_type_id,
+        object_id=object_id,
+        timestamp=timezone.now(),
+    ))
@@ -1,9 +1,60 @@
+from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
-from .models import Notification
+from social_media_api.fast_serializers import ValuesSerializerMixin
+from .models import Notification, format_summary
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     actor_username = serializers.CharField(source="actor.username", read_only=True)
+    summary = serializers.CharField(read_only=True)
+    target = serializers.SerializerMethodField()
+
+    # Characters of a comment shown in its target summary
+    snippet_length = 80
+
+    # .values() fast path (NotificationListView)
+    values_computed = ("summary", "target")
+    values_extra_lookups = ("content_type", "object_id")
 
     class Meta:
         model = Notification
-        fields = ["id", "actor_username", "verb", "timestamp", "read"]
+        fields = ["id", "actor_username", "actor_count", "summary", "verb", "target", "timestamp", "read"]
+
+    def get_target(self, obj):
+        """
+        Short description of the target. Prefetch targets (GenericPrefetch)
+        when serializing many instances; the list view uses prepare_values.
+        """
+        return self.describe_target(obj.target)
+
+    def describe_target(self, target):
+        if target is None:
+            return None
+        data = {"type": target._meta.model_name, "id": target.pk}
+        if hasattr(target, "title"):
+            data["title"] = target.title
+        elif hasattr(target, "content"):
+            content = target.content
+            if len(content) > self.snippet_length:
+                content = content[: self.snippet_length - 1] + "…"
+            data["snippet"] = content
+        return data
+
+    def prepare_values(self, rows):
+        # One query per target type for the page, as GenericPrefetch does
+        ids = {}
+        for row in rows:
+            if row["content_type"] is not None:
+                ids.setdefault(row["content_type"], set()).add(row["object_id"])
+        self._targets = {}
+        for type_id, pks in ids.items():
+            model = ContentType.objects.get_for_id(type_id).model_class()
+            if model is None:
+                continue  # stale content type: its model is gone, so is the target
+            for pk, target in model._base_manager.in_bulk(pks).items():
+                self._targets[type_id, pk] = target
+
+    def values_summary(self, row):
+        return format_summary(row["actor__username"], row["actor_count"], row["verb"])
+
+    def values_target(self, row):
+        return self.describe_target(self._targets.get((row["content_type"], row["object_id"])))
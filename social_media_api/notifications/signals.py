@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import unread
+from .models import Notification
+
+
+# bulk_create / update() bypass these; the pipeline and mark_read invalidate directly
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    unread.invalidate(instance.recipient_id)
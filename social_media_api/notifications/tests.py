@@ -1,3 +1,212 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Post
+from . import unread
+from .models import Notification
+from .serializers import NotificationSerializer
+from .pipeline import Event, QueueBackend, ThreadedQueueBackend, write_events
+
+User = get_user_model()
+
+API_SETTINGS = dict(SECURE_SSL_REDIRECT=False, NOTIFICATION_BACKEND="notifications.pipeline.InlineBackend")
+
+
+@override_settings(**API_SETTINGS)
+class NotificationListTests(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username="recipient", password="pass1234")
+        self.actor = User.objects.create_user(username="actor", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def test_cursor_mode_skips_count(self):
+        for _ in range(15):
+            Notification.objects.create(recipient=self.recipient, actor=self.actor, verb="followed you")
+        first = self.client.get(reverse("notifications") + "?count=false").data
+        self.assertNotIn("count", first)
+        second = self.client.get(first["next"]).data
+        self.assertIsNone(second["next"])
+        ids = [n["id"] for n in first["results"] + second["results"]]
+        self.assertEqual(ids, list(Notification.objects.order_by("-timestamp", "-id").values_list("id", flat=True)))
+
+
+def like_event(recipient, actor, post):
+    return Event(recipient.id, actor.id, "liked your post",
+                 ContentType.objects.get_for_model(Post).id, post.id, timezone.now())
+
+
+@override_settings(**API_SETTINGS)
+class PipelineTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.fans = [User.objects.create_user(username=f"fan{i}", password="pass1234") for i in range(4)]
+        self.post = Post.objects.create(author=self.author, title="viral")
+
+    def test_like_storm_is_coalesced_into_one_row(self):
+        client = APIClient()
+        for fan in self.fans:
+            client.force_authenticate(fan)
+            client.post(reverse("like-post", args=[self.post.id]))
+        notification = Notification.objects.get(recipient=self.author)
+        self.assertEqual(notification.actor_count, 4)
+        self.assertEqual(notification.summary, "fan3 and 3 others liked your post")
+
+    def test_batch_merges_with_existing_unread_row_only(self):
+        write_events([like_event(self.author, self.fans[0], self.post)])
+        Notification.objects.update(read=True)
+        created, updated = write_events([like_event(self.author, fan, self.post) for fan in self.fans])
+        self.assertEqual((created, updated), (1, 0))
+        created, updated = write_events([like_event(self.author, self.fans[0], self.post)])
+        self.assertEqual((created, updated), (0, 1))
+        self.assertEqual(
+            list(Notification.objects.order_by("id").values_list("actor_count", flat=True)), [1, 5]
+        )
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    def test_queue_flushes_in_batches(self):
+        backend = QueueBackend()
+        for fan in self.fans:
+            backend.enqueue(like_event(self.author, fan, self.post))
+        with self.assertNumQueries(2 * 4):  # per batch: lookup, savepoint, write, release
+            self.assertEqual(backend.flush(), 4)
+        self.assertEqual(Notification.objects.get().actor_count, 4)
+
+    def test_follow_notifies(self):
+        client = APIClient()
+        client.force_authenticate(self.fans[0])
+        client.post(reverse("follow-user", args=[self.author.id]))
+        self.assertEqual(Notification.objects.get().summary, "fan0 started following you")
+
+
+class ThreadedBackendTests(TransactionTestCase):
+    def test_worker_writes_queued_events(self):
+        author = User.objects.create_user(username="author", password="pass1234")
+        fan = User.objects.create_user(username="fan", password="pass1234")
+        post = Post.objects.create(author=author, title="viral")
+        backend = ThreadedQueueBackend()
+        backend.enqueue(like_event(author, fan, post))
+        backend.stop()
+        self.assertEqual(Notification.objects.filter(recipient=author).count(), 1)
+
+
+@override_settings(**API_SETTINGS)
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create_user(username="recipient", password="pass1234")
+        self.actor = User.objects.create_user(username="actor", password="pass1234")
+        self.notifications = [
+            Notification.objects.create(recipient=self.recipient, actor=self.actor, verb=f"event {i}")
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def unread_count(self):
+        return self.client.get(reverse("notifications-unread-count")).data["unread_count"]
+
+    def test_cache_hit_runs_no_queries(self):
+        self.assertEqual(self.unread_count(), 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread_count(), 5)
+
+    def test_mark_read_up_to_id(self):
+        self.unread_count()
+        with self.assertNumQueries(2):  # UPDATE + recount
+            response = self.client.post(reverse("notifications-mark-read"), {"up_to": self.notifications[2].id})
+        self.assertEqual(response.data, {"marked": 3, "unread_count": 2})
+        response = self.client.post(reverse("notifications-mark-read"))
+        self.assertEqual(response.data, {"marked": 2, "unread_count": 0})
+
+    def test_new_notifications_invalidate(self):
+        self.assertEqual(self.unread_count(), 5)
+        post = Post.objects.create(author=self.recipient, title="hello")
+        with self.captureOnCommitCallbacks(execute=True):
+            write_events([like_event(self.recipient, self.actor, post)])
+        self.assertEqual(self.unread_count(), 6)
+        Notification.objects.create(recipient=self.recipient, actor=self.actor, verb="direct")
+        self.assertEqual(self.unread_count(), 7)
+
+    def test_count_racing_an_invalidation_is_not_served(self):
+        count_unread = unread.count_unread
+
+        def count_then_new_notification(recipient_id):
+            count = count_unread(recipient_id)
+            # Another request adds a notification after this count was taken
+            Notification.objects.create(recipient=self.recipient, actor=self.actor, verb="late")
+            return count
+
+        with mock.patch.object(unread, "count_unread", side_effect=count_then_new_notification):
+            self.assertEqual(self.unread_count(), 5)
+        self.assertEqual(self.unread_count(), 6)
+
+    @override_settings(NOTIFICATION_UNREAD_TIMEOUT=0)
+    def test_timeout_bounds_staleness(self):
+        self.unread_count()
+        Notification.objects.filter(pk=self.notifications[0].pk).update(read=True)  # no invalidation
+        self.assertEqual(self.unread_count(), 4)
+
+
+@override_settings(**API_SETTINGS)
+class NotificationTargetTests(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username="recipient", password="pass1234")
+        self.actors = [User.objects.create_user(username=f"actor{i}", password="pass1234") for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.recipient)
+
+    def add_notifications(self, n):
+        for i in range(n):
+            post = Post.objects.create(author=self.recipient, title=f"post {i}")
+            comment = Comment.objects.create(post=post, author=self.actors[0], content="x" * 100)
+            actor = self.actors[i % 3]
+            Notification.objects.create(recipient=self.recipient, actor=actor, verb="liked your post", target=post)
+            Notification.objects.create(recipient=self.recipient, actor=actor, verb="commented", target=comment)
+            Notification.objects.create(recipient=self.recipient, actor=actor, verb="started following you")
+
+    def list_queries(self, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("notifications") + f"?page_size={page_size}")
+        return len(ctx.captured_queries), response.data["results"]
+
+    def test_targets_are_summarized(self):
+        self.add_notifications(1)
+        _, results = self.list_queries(10)
+        targets = {row["verb"]: row["target"] for row in results}
+        self.assertEqual(targets["liked your post"]["title"], "post 0")
+        self.assertEqual(targets["commented"]["type"], "comment")
+        self.assertEqual(len(targets["commented"]["snippet"]), 80)
+        self.assertIsNone(targets["started following you"])
+
+    def test_query_count_is_constant(self):
+        self.add_notifications(12)
+        small, _ = self.list_queries(3)
+        large, results = self.list_queries(30)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(small, large)
+
+    def test_values_path_matches_serializer(self):
+        self.add_notifications(4)
+        Notification.objects.filter(verb="commented").update(actor_count=3)
+        _, results = self.list_queries(30)
+        expected = NotificationSerializer(Notification.objects.filter(recipient=self.recipient), many=True).data
+        self.assertEqual(len(results), 12)
+        self.assertEqual({row["id"]: row for row in results}, {row["id"]: row for row in expected})
+
+    def test_target_of_removed_model_is_none(self):
+        stale = ContentType.objects.create(app_label="removed", model="gone")
+        Notification.objects.create(
+            recipient=self.recipient, actor=self.actors[0], verb="liked your post", content_type=stale, object_id=1
+        )
+        _, results = self.list_queries(10)
+        self.assertEqual([row["target"] for row in results], [None])
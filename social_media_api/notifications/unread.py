@@ -0,0 +1,79 @@
+"""
+Cached per-recipient unread counters for the notification badge.
+
+The count is computed from the (recipient, read, timestamp) index and kept
+in the NOTIFICATION_UNREAD_CACHE_ALIAS cache for NOTIFICATION_UNREAD_TIMEOUT
+seconds. Use a shared backend with several workers: with the per-process
+default, the short timeout is what bounds how stale another worker's badge
+can be.
+
+Counts are stored under a per-recipient generation number. New
+notifications (see pipeline.write_events) and mark-read requests bump it
+rather than deleting the count, so a count computed before the bump is
+written under the old generation and never read again.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Notification
+
+
+def get_cache():
+    return caches[getattr(settings, "NOTIFICATION_UNREAD_CACHE_ALIAS", None) or "default"]
+
+
+def generation_key(recipient_id):
+    return f"notifications:unread-gen:{recipient_id}"
+
+
+def cache_key(recipient_id, generation):
+    return f"notifications:unread:{recipient_id}:{generation}"
+
+
+def generation(cache, recipient_id):
+    key = generation_key(recipient_id)
+    value = cache.get(key)
+    if value is None:
+        # A missing (never set or evicted) generation restarts from a value
+        # no earlier count can have been stored under
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def count_unread(recipient_id):
+    return Notification.objects.filter(recipient_id=recipient_id, read=False).count()
+
+
+def unread_count(recipient_id):
+    cache = get_cache()
+    # Read the generation before counting: an invalidation while we count
+    # moves it on, and this count lands under a key nobody reads
+    key = cache_key(recipient_id, generation(cache, recipient_id))
+    count = cache.get(key)
+    if count is None:
+        count = count_unread(recipient_id)
+        cache.set(key, count, getattr(settings, "NOTIFICATION_UNREAD_TIMEOUT", 60))
+    return count
+
+
+def invalidate(*recipient_ids):
+    cache = get_cache()
+    for recipient_id in recipient_ids:
+        try:
+            cache.incr(generation_key(recipient_id))
+        except ValueError:
+            pass  # no generation yet, so no cached count either
+
+
+def mark_read(recipient_id, up_to_id=None):
+    """Mark unread notifications (optionally only ids <= up_to_id) read in one UPDATE."""
+    qs = Notification.objects.filter(recipient_id=recipient_id, read=False)
+    if up_to_id is not None:
+        qs = qs.filter(id__lte=up_to_id)
+    marked = qs.update(read=True)
+    if marked:
+        invalidate(recipient_id)
+    return marked
@@ -1,11 +1,37 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, serializers
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from social_media_api.fast_serializers import ValuesListMixin
 from .models import Notification
 from .serializers import NotificationSerializer
+from . import unread
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ("-timestamp", "-id")
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        # list() reads .values() rows; NotificationSerializer.prepare_values
+        # resolves the targets with one query per content type for the page
+        return Notification.objects.filter(recipient=self.request.user).select_related("actor")
+
+
+class UnreadCountView(APIView):
+    """Badge endpoint; served from the cache without touching the notification table."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": unread.unread_count(request.user.id)})
+
+
+class MarkReadView(APIView):
+    """Mark every unread notification, or those with id <= ``up_to``, as read."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        up_to = request.data.get("up_to")
+        if up_to is not None:
+            up_to = serializers.IntegerField(min_value=1).run_validation(up_to)
+        marked = unread.mark_read(request.user.id, up_to)
+        return Response({"marked": marked, "unread_count": unread.unread_count(request.user.id)})
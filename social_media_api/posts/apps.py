@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, plan=None, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_index
+
+    if any(backwards and migration.app_label == sender.label for migration, backwards in plan or ()):
+        return  # unapplying posts migrations; leave the search index to them
+    ensure_index(connections[using])
 
 
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'posts'
+
+    def ready(self):
+        # Re-create search triggers that SQLite drops when a migration rebuilds posts_post
+        post_migrate.connect(ensure_search_index, sender=self)
+
+        from social_media_api.response_cache import invalidate_on_change
+        from .views import PostViewSet
+
+        # Connected here rather than on first URL resolution, so writes from
+        # the shell, commands and workers retire cached post lists too
+        invalidate_on_change(*PostViewSet.cache_models)
@@ -0,0 +1,14 @@
+from rest_framework.filters import SearchFilter
+
+from .search import search_posts
+
+
+class PostSearchFilter(SearchFilter):
+    """
+    ``?search=`` answered from the full-text index (see posts.search) and
+    ordered by relevance, instead of ``LIKE '%term%'`` over ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "")
+        return search_posts(queryset, text)
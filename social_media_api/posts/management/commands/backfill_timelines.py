@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Populate home timelines from existing follow edges."
+
+    # Authors whose recent posts are kept in memory between followers
+    cache_size = 10000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--per-author", type=int, default=None,
+            help="Recent posts copied per followed author (default: TIMELINE_BACKFILL_LIMIT).",
+        )
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Drop all existing timeline entries before backfilling.",
+        )
+
+    def handle(self, *args, **options):
+        backend = timeline.get_backend()
+        if options["clear"]:
+            backend.clear()
+
+        limit = options["per_author"] or timeline.backfill_limit()
+        Follow = User.following.through
+
+        # Authors above the fan-out threshold are read on demand, never copied
+        pulled = set(
+            User.objects.filter(followers_count__gt=timeline.fanout_max_followers()).values_list("id", flat=True)
+        )
+        recent = {}
+
+        def items_for(author_id):
+            if author_id not in recent:
+                if len(recent) >= self.cache_size:
+                    recent.clear()
+                recent[author_id] = timeline.recent_items(author_id, limit)
+            return recent[author_id]
+
+        edges = owners = 0
+        owner_id, items = None, []
+        rows = Follow.objects.order_by("from_user_id").values_list("from_user_id", "to_user_id")
+        for from_id, to_id in rows.iterator():
+            edges += 1
+            if from_id != owner_id:
+                if items:
+                    backend.extend(owner_id, items)
+                owner_id, items = from_id, []
+                owners += 1
+            if to_id not in pulled:
+                items.extend(items_for(to_id))
+        if items:
+            backend.extend(owner_id, items)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {owners} timelines from {edges} follow edges."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from posts.search import backend_for
+
+
+class Command(BaseCommand):
+    help = "Create the post full-text index if missing and re-index every post."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        backend = backend_for(connection.vendor)
+        backend.install(connection)
+        backend.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt post search index with {type(backend).__name__}."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.likes_count / comments_count where they have drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report drifted posts without writing.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            # Walk the table by primary key range so each batch is an index seek
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            checked += len(pks)
+
+            drifted = list(Post.objects.filter(pk__in=pks).drifted().values_list("pk", flat=True))
+            fixed += len(drifted)
+            if drifted and not options["dry_run"]:
+                # Recounted inside the UPDATE, so writes since the check are included
+                Post.objects.filter(pk__in=drifted).recount()
+
+        verb = "would fix" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} posts, {verb} {fixed}."))
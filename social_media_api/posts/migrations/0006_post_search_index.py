@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# The index as this migration creates it, frozen here so later changes to
+# posts.search cannot change what it does. posts.apps re-installs the
+# current definition after every migrate.
+INSTALL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+        "title, content, content='posts_post', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT ON posts_post BEGIN "
+        "INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE ON posts_post BEGIN "
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); END",
+        "CREATE TRIGGER IF NOT EXISTS posts_post_fts_au AFTER UPDATE OF title, content ON posts_post BEGIN "
+        "INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+        "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+    ],
+    "postgresql": [
+        "CREATE INDEX IF NOT EXISTS posts_post_search_idx ON posts_post USING gin ("
+        "(setweight(to_tsvector('english', coalesce(posts_post.title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(posts_post.content, '')), 'B')))",
+    ],
+}
+
+UNINSTALL = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS posts_post_fts_ai",
+        "DROP TRIGGER IF EXISTS posts_post_fts_ad",
+        "DROP TRIGGER IF EXISTS posts_post_fts_au",
+        "DROP TABLE IF EXISTS posts_post_fts",
+    ],
+    "postgresql": [
+        "DROP INDEX IF EXISTS posts_post_search_idx",
+    ],
+}
+
+
+def install_search_index(apps, schema_editor):
+    for sql in INSTALL.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql, params=None)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for sql in UNINSTALL.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
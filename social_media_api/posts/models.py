@@ -1,26 +1,70 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 User = settings.AUTH_USER_MODEL
 
 
+def _count_of(model):
+    """Correlated COUNT(*) of ``model`` rows pointing at the outer post."""
+    counts = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class PostQuerySet(models.QuerySet):
+    def with_actual_counts(self):
+        """Annotate the recomputed like/comment totals next to the stored counters."""
+        return self.annotate(actual_likes=_count_of(Like), actual_comments=_count_of(Comment))
+
+    def recount(self):
+        """Rewrite the stored counters from the Like/Comment tables in one UPDATE."""
+        return self.update(likes_count=_count_of(Like), comments_count=_count_of(Comment))
+
+    def drifted(self):
+        """Posts whose stored counters disagree with the Like/Comment tables."""
+        return self.with_actual_counts().filter(
+            ~Q(likes_count=F("actual_likes")) | ~Q(comments_count=F("actual_comments"))
+        )
+
+
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     title = models.CharField(max_length=200)
     content = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized counters, only ever changed through Post.bump_counters()
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="post_recent_idx"),
+            models.Index(fields=["author", "-created_at", "-id"], name="post_author_recent_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.author})"
 
-    @property
-    def likes_count(self):
-        """Returns number of likes for this post"""
-        return self.likes.count()
+    @classmethod
+    def bump_counters(cls, pk, **deltas):
+        """
+        Atomically add ``deltas`` to counter columns in the database, e.g.
+        ``Post.bump_counters(pk, likes_count=1)``. Uses a single
+        ``UPDATE ... SET col = col + n`` so concurrent requests never lose
+        increments.
+        """
+        cls.objects.filter(pk=pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
 
 
 class Comment(models.Model):
@@ -32,6 +76,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comment_created_idx"),
+            models.Index(fields=["post", "created_at", "id"], name="comment_post_created_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post_id}"
@@ -46,6 +94,62 @@ class Like(models.Model):
     class Meta:
         unique_together = ("user", "post")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["post", "-created_at", "-id"], name="like_post_recent_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="like_user_recent_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} liked {self.post}"
+
+
+class TimelineEntry(models.Model):
+    """A post fanned out into a follower's home timeline (see posts.timeline)."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline_entries")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="timeline_entries")
+    author_id = models.BigIntegerField()
+    # Copy of post.created_at so the feed is an index-only range scan
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("owner", "post")
+        ordering = ["-created_at", "-post_id"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at", "-post"], name="timeline_owner_recent_idx"),
+            models.Index(fields=["owner", "author_id"], name="timeline_owner_author_idx"),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in timeline of {self.owner_id}"
+
+
+class FullTextMatch(models.Lookup):
+    """``field__match=expression``: an FTS5 ``MATCH`` against the field's table."""
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class PostSearchEntry(models.Model):
+    """
+    A row of the SQLite full-text index over posts (see posts.search). The
+    table is created and kept in sync by posts.search, not by migrations;
+    the model only lets a Post query join it, e.g.
+    ``Post.objects.filter(search_entry__document__match='"djan"*')``.
+    """
+    post = models.OneToOneField(
+        Post, primary_key=True, db_column="rowid", db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name="search_entry",
+    )
+    # FTS5's hidden column named after the table, which MATCH is applied to
+    document = models.TextField(db_column="posts_post_fts")
+
+    class Meta:
+        managed = False
+        db_table = "posts_post_fts"
+
+
+PostSearchEntry._meta.get_field("document").register_lookup(FullTextMatch)
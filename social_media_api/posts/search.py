@@ -0,0 +1,197 @@
+"""
+Full-text search over posts.
+
+``SearchFilter`` compiles ``?search=`` to ``LIKE '%term%'`` on every
+searched column, which cannot use an index and scans the whole post table.
+The backends here answer the same query from a full-text index instead,
+ranked by relevance (title matches weigh more than body matches) and with
+prefix matching on every term, so ``?search=djan`` finds "Django".
+
+The backend is chosen by the ``POST_SEARCH_BACKEND`` setting; when unset it
+follows the database vendor:
+
+* ``posts.search.SQLiteSearchBackend`` uses an FTS5 virtual table over
+  ``posts_post`` (external content, no copy of the text) kept in sync by
+  triggers, so bulk_create() and queryset.update() are indexed too.
+* ``posts.search.PostgresSearchBackend`` uses a GIN expression index over a
+  weighted ``tsvector`` of title and content.
+* ``posts.search.LikeSearchBackend`` is the unindexed ``icontains``
+  fallback for any other database.
+
+The index objects are created by a migration and re-ensured after every
+``migrate`` (see ``posts.apps``): SQLite drops triggers when a migration
+rebuilds the post table.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Terms beyond this are ignored rather than producing an unbounded query
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(text):
+    """Split user input into lower-cased word tokens, dropping operators and quotes."""
+    return _TERM_RE.findall(text.lower())[:MAX_TERMS]
+
+
+class BaseSearchBackend:
+    def search(self, queryset, terms):
+        """
+        Narrow a Post ``queryset`` to posts matching every term (as a prefix)
+        and order it by relevance, best first.
+        """
+        raise NotImplementedError
+
+    def install(self, connection):
+        """Create the index objects if they are missing. Must be idempotent."""
+
+    def uninstall(self, connection):
+        pass
+
+    def rebuild(self, connection):
+        """Re-index every post from scratch."""
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(content__icontains=term))
+        return queryset
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    table = "posts_post_fts"
+    # bm25() column weights, in the order the columns are declared
+    title_weight = 10.0
+    content_weight = 1.0
+
+    def match_expression(self, terms):
+        return " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def search(self, queryset, terms):
+        # Join the index (posts.models.PostSearchEntry) so bm25() can rank
+        # the rows of the MATCH; it is not callable outside that query
+        rank = RawSQL(f"bm25({self.table}, {self.title_weight}, {self.content_weight})", [], output_field=FloatField())
+        return (
+            queryset.filter(search_entry__document__match=self.match_expression(terms))
+            .annotate(search_rank=rank)
+            .order_by("search_rank", "-id")  # bm25 is lower-is-better
+        )
+
+    def install(self, connection):
+        fts = self.table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                "title, content, content='posts_post', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON posts_post BEGIN "
+                f"INSERT INTO {fts}(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON posts_post BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, content) "
+                "VALUES ('delete', old.id, old.title, old.content); END"
+            )
+            # Only text changes re-index; counter bumps leave the index alone
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, content ON posts_post BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, content) "
+                "VALUES ('delete', old.id, old.title, old.content); "
+                f"INSERT INTO {fts}(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+            )
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    index = "posts_post_search_idx"
+    config = "english"
+
+    def vector_expression(self, table):
+        # Must match the indexed expression exactly for the planner to use the index
+        return (
+            f"(setweight(to_tsvector('{self.config}', coalesce({table}.title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce({table}.content, '')), 'B'))"
+        )
+
+    def tsquery(self, terms):
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def search(self, queryset, terms):
+        vector = self.vector_expression(queryset.model._meta.db_table)
+        query = f"to_tsquery('{self.config}', %s)"
+        tsquery = self.tsquery(terms)
+        return (
+            queryset.filter(RawSQL(f"{vector} @@ {query}", [tsquery], output_field=BooleanField()))
+            .annotate(search_rank=RawSQL(f"ts_rank({vector}, {query})", [tsquery], output_field=FloatField()))
+            .order_by("-search_rank", "-id")
+        )
+
+    def install(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index} ON posts_post "
+                f"USING gin ({self.vector_expression('posts_post')})"
+            )
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX IF EXISTS {self.index}")
+
+    def rebuild(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"REINDEX INDEX {self.index}")
+
+
+VENDOR_BACKENDS = {
+    "sqlite": "posts.search.SQLiteSearchBackend",
+    "postgresql": "posts.search.PostgresSearchBackend",
+}
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def backend_for(vendor):
+    """The vendor's full-text backend, ignoring POST_SEARCH_BACKEND."""
+    return _load_backend(VENDOR_BACKENDS.get(vendor, "posts.search.LikeSearchBackend"))
+
+
+def get_backend():
+    path = getattr(settings, "POST_SEARCH_BACKEND", None)
+    if path:
+        return _load_backend(path)
+    return backend_for(connection.vendor)
+
+
+def search_posts(queryset, text):
+    """Filter and rank a Post queryset by free-text ``text``; unchanged when it has no terms."""
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+    return get_backend().search(queryset, terms)
+
+
+def ensure_index(connection):
+    backend_for(connection.vendor).install(connection)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from social_media_api.fast_serializers import ValuesSerializerMixin
 from .models import Post, Comment
 
 User = get_user_model()
@@ -28,25 +29,22 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
     author = UserMiniSerializer(read_only=True)
     author_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="author", write_only=True, required=False
     )
+    # Denormalized counters stored on Post
     comments_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
         fields = [
             "id", "author", "author_id", "title", "content",
-            "created_at", "updated_at", "comments_count"
+            "created_at", "updated_at", "comments_count", "likes_count"
         ]
-        read_only_fields = ["id", "author", "created_at", "updated_at", "comments_count"]
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["comments_count"] = instance.comments.count()
-        return data
+        read_only_fields = ["id", "author", "created_at", "updated_at", "comments_count", "likes_count"]
 
     def create(self, validated_data):
         request = self.context.get("request")
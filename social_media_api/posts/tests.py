@@ -1,3 +1,501 @@
-from django.test import TestCase
+import json
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts import graph
+from social_media_api import renderers
+from social_media_api.renderers import ORJSONRenderer
+from . import timeline
+from .models import Comment, Like, Post, TimelineEntry
+from .serializers import PostSerializer
+
+User = get_user_model()
+
+API_SETTINGS = dict(SECURE_SSL_REDIRECT=False, NOTIFICATION_BACKEND="notifications.pipeline.InlineBackend")
+
+
+@override_settings(**API_SETTINGS)
+class TimelineFeedTests(TestCase):
+    def setUp(self):
+        self.reader = User.objects.create_user(username="reader", password="pass1234")
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.other = User.objects.create_user(username="other", password="pass1234")
+        graph.follow(self.reader, self.author)
+        self.client = APIClient()
+
+    def create_post(self, user, title):
+        # Fresh instance per request, as token authentication would load it
+        self.client.force_authenticate(User.objects.get(pk=user.pk))
+        response = self.client.post(reverse("post-list"), {"title": title, "content": "body"})
+        self.assertEqual(response.status_code, 201)
+        return Post.objects.get(pk=response.data["id"])
+
+    def feed(self, url=None):
+        self.client.force_authenticate(self.reader)
+        return self.client.get(url or reverse("feed")).data
+
+    def test_create_fans_out_to_followers(self):
+        post = self.create_post(self.author, "hello")
+        self.create_post(self.other, "not followed")
+        self.assertTrue(TimelineEntry.objects.filter(owner=self.reader, post=post).exists())
+        self.assertEqual([p["title"] for p in self.feed()["results"]], ["hello"])
+
+    def test_feed_keyset_pagination(self):
+        titles = [self.create_post(self.author, f"post {i}").title for i in range(5)]
+        page = self.feed(reverse("feed") + "?limit=2")
+        seen = [p["title"] for p in page["results"]]
+        while page["next"]:
+            page = self.feed(page["next"])
+            seen += [p["title"] for p in page["results"]]
+        self.assertEqual(seen, list(reversed(titles)))
+
+    def test_feed_limit_is_clamped_in_next_link(self):
+        for i in range(2):
+            self.create_post(self.author, f"post {i}")
+        page = self.feed(reverse("feed") + "?limit=-5")
+        self.assertEqual(len(page["results"]), 1)
+        self.assertIn("limit=1", page["next"])
+        self.assertEqual(len(self.feed(page["next"])["results"]), 1)
+
+    def test_follow_and_unfollow_update_timeline(self):
+        post = self.create_post(self.other, "backlog")
+        self.client.force_authenticate(self.reader)
+        self.client.post(reverse("follow-user", args=[self.other.id]))
+        self.assertEqual([p["id"] for p in self.feed()["results"]], [post.id])
+        self.client.force_authenticate(self.reader)
+        self.client.post(reverse("unfollow-user", args=[self.other.id]))
+        self.assertEqual(self.feed()["results"], [])
+
+    def test_deleted_post_leaves_feed(self):
+        post = self.create_post(self.author, "gone")
+        self.client.force_authenticate(self.author)
+        self.client.delete(reverse("post-detail", args=[post.id]))
+        self.assertEqual(self.feed()["results"], [])
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0)
+    def test_high_follower_authors_are_read_on_demand(self):
+        post = self.create_post(self.author, "celebrity")
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual([p["id"] for p in self.feed()["results"]], [post.id])
+
+    def test_backfill_command(self):
+        post = Post.objects.create(author=self.author, title="old")
+        self.assertFalse(TimelineEntry.objects.exists())
+        call_command("backfill_timelines", stdout=StringIO())
+        self.assertEqual(self.feed()["results"][0]["id"], post.id)
+
+
+class InMemoryTimelineBackendTests(TestCase):
+    def test_fetch_is_newest_first_with_keyset_bound(self):
+        backend = timeline.InMemoryTimelineBackend()
+        author = User.objects.create_user(username="a", password="pass1234")
+        posts = [Post.objects.create(author=author, title=str(i)) for i in range(4)]
+        backend.push([1], timeline.item_for(posts[0]))
+        backend.extend(1, [timeline.item_for(p) for p in posts[1:]])
+        first = backend.fetch(1, limit=2)
+        self.assertEqual([i.post_id for i in first], [posts[3].id, posts[2].id])
+        rest = backend.fetch(1, before=first[-1][:2], limit=10)
+        self.assertEqual([i.post_id for i in rest], [posts[1].id, posts[0].id])
+        backend.remove_author(1, author.id)
+        self.assertEqual(backend.fetch(1), [])
+
+
+@override_settings(**API_SETTINGS)
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="pass1234")
+        self.post = Post.objects.create(author=self.user, title="first")
+        for i in range(24):
+            Post.objects.create(author=self.user, title=f"post {i}")
+        for i in range(12):
+            Comment.objects.create(post=self.post, author=self.user, content=f"comment {i}")
+        self.client = APIClient()
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            data = self.client.get(url).data
+            self.assertNotIn("count", data)
+            ids += [row["id"] for row in data["results"]]
+            url, pages = data["next"], pages + 1
+        return ids, pages
+
+    def test_page_number_mode_is_default(self):
+        data = self.client.get(reverse("post-list")).data
+        self.assertEqual(data["count"], 25)
+        self.assertEqual(len(data["results"]), 10)
+
+    def test_posts_cursor_mode_walks_newest_first(self):
+        ids, pages = self.walk(reverse("post-list") + "?count=false")
+        expected = list(Post.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_comments_cursor_mode_walks_oldest_first(self):
+        ids, _ = self.walk(reverse("comment-list") + f"?count=false&post={self.post.id}&page_size=5")
+        expected = list(Comment.objects.order_by("created_at", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(reverse("post-list") + "?cursor=bogus").status_code, 404)
+
+
+@override_settings(**API_SETTINGS)
+class ListQueryCountTests(TestCase):
+    """Listing cost must not grow with the number of rows on the page."""
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username="reader", password="pass1234")
+        authors = [User.objects.create_user(username=f"author{i}", password="pass1234") for i in range(3)]
+        for i in range(30):
+            post = Post.objects.create(author=authors[i % 3], title=f"post {i}")
+            Comment.objects.create(post=post, author=self.reader, content="nice")
+            Like.objects.create(post=post, user=self.reader)
+        Post.objects.all().recount()
+        for author in authors:
+            self.reader.following.add(author)
+        call_command("backfill_timelines", stdout=StringIO())
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def assertConstantQueries(self, url, sizes=(2, 5, 20)):
+        counts = []
+        for size in sizes:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url.format(size=size))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(len(set(counts)), 1, counts)
+        return counts[0], response.data
+
+    def test_post_list(self):
+        queries, data = self.assertConstantQueries(reverse("post-list") + "?page_size={size}")
+        self.assertEqual(queries, 2)  # COUNT + page
+        self.assertEqual(data["results"][0]["comments_count"], 1)
+        self.assertEqual(data["results"][0]["likes_count"], 1)
+
+    def test_post_list_cursor_mode(self):
+        queries, _ = self.assertConstantQueries(reverse("post-list") + "?count=false&page_size={size}")
+        self.assertEqual(queries, 1)
+
+    def test_comment_list(self):
+        queries, _ = self.assertConstantQueries(reverse("comment-list") + "?page_size={size}")
+        self.assertEqual(queries, 2)
+
+    def test_feed(self):
+        queries, data = self.assertConstantQueries(reverse("feed") + "?limit={size}")
+        self.assertEqual(data["results"][0]["likes_count"], 1)
+
+
+@override_settings(**API_SETTINGS)
+class CounterTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.fan = User.objects.create_user(username="fan", password="pass1234")
+        self.post = Post.objects.create(author=self.author, title="counted")
+        self.client = APIClient()
+        self.client.force_authenticate(self.fan)
+
+    def counters(self):
+        self.post.refresh_from_db()
+        return self.post.likes_count, self.post.comments_count
+
+    def test_like_unlike_and_comment_lifecycle(self):
+        like_url = reverse("like-post", args=[self.post.id])
+        self.assertEqual(self.client.post(like_url).status_code, 201)
+        self.assertEqual(self.client.post(like_url).status_code, 400)
+        response = self.client.post(reverse("comment-list"), {"post": self.post.id, "content": "hi"})
+        self.assertEqual(self.counters(), (1, 1))
+
+        self.client.delete(reverse("comment-detail", args=[response.data["id"]]))
+        self.client.post(reverse("unlike-post", args=[self.post.id]))
+        self.assertEqual(self.client.post(reverse("unlike-post", args=[self.post.id])).status_code, 400)
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_reconcile_command_fixes_drift(self):
+        Like.objects.create(user=self.fan, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(comments_count=7)
+        out = StringIO()
+        call_command("reconcile_post_counters", "--batch-size", "1", stdout=out)
+        self.assertIn("fixed 1", out.getvalue())
+        self.assertEqual(self.counters(), (1, 0))
+
+
+@override_settings(**API_SETTINGS)
+class PostSearchTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.in_title = Post.objects.create(author=self.author, title="Django tips", content="models and views")
+        self.in_body = Post.objects.create(author=self.author, title="Weekend", content="read about django")
+        Post.objects.create(author=self.author, title="Unrelated", content="gardening")
+        self.client = APIClient()
+
+    def search(self, text):
+        response = self.client.get(reverse("post-list"), {"search": text})
+        self.assertEqual(response.status_code, 200)
+        return [p["id"] for p in response.data["results"]]
+
+    def test_prefix_match_ranked_title_first(self):
+        self.assertEqual(self.search("djan"), [self.in_title.id, self.in_body.id])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search("django views"), [self.in_title.id])
+
+    def test_index_follows_writes(self):
+        Post.objects.filter(pk=self.in_body.pk).update(title="Flask", content="micro")
+        Post.objects.bulk_create([Post(author=self.author, title="bulk", content="djangonaut")])
+        self.in_title.delete()
+        self.assertEqual(self.search("flask"), [self.in_body.id])
+        self.assertEqual(len(self.search("django")), 1)
+
+    def test_counter_updates_keep_index_intact(self):
+        Post.bump_counters(self.in_title.pk, likes_count=1)
+        self.assertEqual(self.search("tips"), [self.in_title.id])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('django" OR NEAR(*'), [])
+        self.assertEqual(len(self.search("  ")), 3)
+
+    @override_settings(POST_SEARCH_BACKEND="posts.search.LikeSearchBackend")
+    def test_like_fallback_backend(self):
+        self.assertEqual(sorted(self.search("djan")), sorted([self.in_title.id, self.in_body.id]))
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command("rebuild_post_search_index", stdout=out)
+        self.assertIn("Rebuilt", out.getvalue())
+        self.assertEqual(self.search("gardening"), [Post.objects.get(title="Unrelated").id])
+
+
+@override_settings(**API_SETTINGS)
+class ConditionalRetrieveTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.post = Post.objects.create(author=self.author, title="etag", content="body")
+        self.comment = Comment.objects.create(post=self.post, author=self.author, content="hi")
+        self.client = APIClient()
+
+    def test_unchanged_post_is_not_modified_without_loading_it(self):
+        url = reverse("post-detail", args=[self.post.id])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+        # Just the validator lookup
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        Post.bump_counters(self.post.pk, likes_count=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_comment_edit_changes_etag(self):
+        url = reverse("comment-detail", args=[self.comment.id])
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("Last-Modified"))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        self.client.force_authenticate(self.author)
+        self.client.patch(url, {"content": "edited"})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["content"], "edited")
+
+    def test_author_rename_changes_etags(self):
+        urls = [reverse("post-detail", args=[self.post.id]), reverse("comment-detail", args=[self.comment.id])]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+        self.author.username = "renamed"
+        self.author.save()
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["author"]["username"], "renamed")
+
+    def test_missing_or_malformed_lookups_are_404(self):
+        self.assertEqual(self.client.get(reverse("post-detail", args=[999])).status_code, 404)
+        self.assertEqual(self.client.get("/api/posts/abc/").status_code, 404)
+
+
+@override_settings(**API_SETTINGS)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        self.reader = User.objects.create_user(username="reader", password="pass1234")
+        self.post = Post.objects.create(author=self.author, title="cached", content="body")
+        self.client = APIClient()
+        self.url = reverse("post-list")
+
+    def test_repeat_list_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        # Other query parameters and other users are cached separately
+        self.assertEqual(self.client.get(self.url, {"page_size": 5})["X-Cache"], "MISS")
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+
+    def test_writes_invalidate(self):
+        self.client.get(self.url)
+        Like.objects.create(post=self.post, user=self.reader)
+        Post.bump_counters(self.post.pk, likes_count=1)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["likes_count"], 1)
+
+        self.author.username = "renamed"
+        self.author.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["author"]["username"], "renamed")
+
+    def test_detail_is_not_cached(self):
+        response = self.client.get(reverse("post-detail", args=[self.post.id]))
+        self.assertFalse(response.has_header("X-Cache"))
+
+
+@override_settings(**API_SETTINGS)
+class FastRenderingTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass1234")
+        for i in range(15):
+            post = Post.objects.create(author=self.author, title=f"post {i}", content="ünïcode body")
+            Comment.objects.create(post=post, author=self.author, content="hi")
+            Post.bump_counters(post.pk, comments_count=1)
+        self.client = APIClient()
+
+    def test_values_path_matches_serializer(self):
+        for params in ({"page_size": 20}, {"count": "false", "page_size": 5}, {"search": "post"}):
+            with self.subTest(params=params):
+                results = self.client.get(reverse("post-list"), params).data["results"]
+                ids = [row["id"] for row in results]
+                expected = PostSerializer(Post.objects.filter(pk__in=ids).select_related("author"), many=True).data
+                self.assertEqual({row["id"]: row for row in results}, {row["id"]: row for row in expected})
+        # The keyset cursor is read from the .values() rows too
+        first = self.client.get(reverse("post-list"), {"count": "false", "page_size": 10}).data
+        rest = self.client.get(first["next"]).data["results"]
+        self.assertEqual(len(first["results"]) + len(rest), 15)
+
+    def test_orjson_output_matches_json_renderer(self):
+        data = self.client.get(reverse("post-list")).data
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        response = self.client.get(reverse("post-list"))
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), json.loads(json.dumps(data)))
+
+    @skipUnless(renderers.msgpack, "msgpack is not installed")
+    def test_msgpack_is_negotiated(self):
+        response = self.client.get(reverse("post-list"), HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(renderers.msgpack.unpackb(response.content)["count"], 15)
+
+
+@contextmanager
+def file_database():
+    """
+    Run on a migrated SQLite file instead of the in-memory test database.
+
+    Threads sharing the in-memory database fail at once on each other's
+    table locks; connections to a file wait for them (``timeout``), and
+    IMMEDIATE transactions take the write lock up front, so a read-then-
+    write transaction cannot deadlock. Other databases are used as they are.
+    """
+    settings_dict = connection.settings_dict
+    if not connection.is_in_memory_db():
+        yield
+        return
+    saved = settings_dict["NAME"], settings_dict["OPTIONS"]
+    # Keeps the in-memory database alive while no Django connection uses it
+    keeper = sqlite3.connect(saved[0], uri=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings_dict["NAME"] = str(Path(tmp) / "concurrency.sqlite3")
+        settings_dict["OPTIONS"] = {**saved[1], "timeout": 30, "transaction_mode": "IMMEDIATE"}
+        connection.close()
+        try:
+            call_command("migrate", verbosity=0)
+            yield
+        finally:
+            connections.close_all()
+            settings_dict["NAME"], settings_dict["OPTIONS"] = saved
+            connection.ensure_connection()
+            keeper.close()
+
+
+@override_settings(**API_SETTINGS)
+class ConcurrentLikeTests(TransactionTestCase):
+    threads = 8
+    rounds = 10
+
+    def setUp(self):
+        database = file_database()
+        database.__enter__()
+        self.addCleanup(database.__exit__, None, None, None)
+        self.author = User.objects.create_user(username="author", password="x")
+        self.post = Post.objects.create(author=self.author, title="hot")
+
+    def run_threads(self, target):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def run(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as exc:  # surfaced in the main thread below
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=run, args=(index,)) for index in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
+    def test_counter_stays_exact_under_concurrent_like_unlike(self):
+        post = self.post
+        users = [User.objects.create_user(username=f"fan{i}", password="x") for i in range(self.threads)]
+
+        def hammer(index):
+            client = APIClient()
+            client.force_authenticate(users[index])
+            for _ in range(self.rounds):
+                client.post(reverse("like-post", args=[post.id]))
+                client.post(reverse("like-post", args=[post.id]))
+                client.post(reverse("unlike-post", args=[post.id]))
+                client.post(reverse("unlike-post", args=[post.id]))
+            client.post(reverse("like-post", args=[post.id]))
+
+        self.run_threads(hammer)
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, Like.objects.filter(post=post).count())
+        self.assertEqual(post.likes_count, self.threads)
+
+    def test_bump_counters_loses_no_increments(self):
+        # On SQLite the like views' transactions run one at a time; bare
+        # autocommit UPDATEs interleave, so a read-modify-write would lose some
+        def bump(index):
+            for _ in range(self.rounds * 5):
+                Post.bump_counters(self.post.pk, likes_count=1)
+
+        self.run_threads(bump)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, self.threads * self.rounds * 5)
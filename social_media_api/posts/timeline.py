@@ -0,0 +1,253 @@
+"""
+Materialized home timelines for the feed.
+
+New posts are fanned out on write into a per-follower timeline so the feed
+is a keyset range read instead of an ``author__in`` join over everything the
+user follows. Authors with more than ``TIMELINE_FANOUT_MAX_FOLLOWERS``
+followers are not fanned out; their posts are merged in at read time
+(hybrid fan-out-on-read).
+
+The storage is pluggable through the ``TIMELINE_BACKEND`` setting:
+
+* ``posts.timeline.DatabaseTimelineBackend`` (default) stores rows in
+  ``TimelineEntry``.
+* ``posts.timeline.InMemoryTimelineBackend`` keeps capped, sorted lists per
+  user in process, mirroring a Redis sorted-set layout.
+"""
+import bisect
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post, TimelineEntry
+
+User = get_user_model()
+
+# One timeline slot; ordering by (created_at, post_id) is the keyset order
+TimelineItem = namedtuple("TimelineItem", ["created_at", "post_id", "author_id"])
+
+
+def fanout_max_followers():
+    return getattr(settings, "TIMELINE_FANOUT_MAX_FOLLOWERS", 5000)
+
+
+def backfill_limit():
+    return getattr(settings, "TIMELINE_BACKFILL_LIMIT", 200)
+
+
+def item_for(post):
+    return TimelineItem(post.created_at, post.pk, post.author_id)
+
+
+class BaseTimelineBackend:
+    def push(self, owner_ids, item):
+        """Add one item to the timeline of every user in ``owner_ids``."""
+        raise NotImplementedError
+
+    def extend(self, owner_id, items):
+        """Add many items to a single user's timeline (follow / backfill)."""
+        raise NotImplementedError
+
+    def remove_author(self, owner_id, author_id):
+        """Drop every post by ``author_id`` from one timeline (unfollow)."""
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        raise NotImplementedError
+
+    def fetch(self, owner_id, before=None, limit=20):
+        """
+        Return up to ``limit`` items newest first, strictly older than the
+        ``before`` (created_at, post_id) position when given.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class DatabaseTimelineBackend(BaseTimelineBackend):
+    batch_size = 1000
+
+    def push(self, owner_ids, item):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=owner_id, post_id=item.post_id,
+                              author_id=item.author_id, created_at=item.created_at)
+                for owner_id in owner_ids
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def extend(self, owner_id, items):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=owner_id, post_id=item.post_id,
+                              author_id=item.author_id, created_at=item.created_at)
+                for item in items
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def remove_author(self, owner_id, author_id):
+        TimelineEntry.objects.filter(owner_id=owner_id, author_id=author_id).delete()
+
+    def remove_post(self, post_id):
+        TimelineEntry.objects.filter(post_id=post_id).delete()
+
+    def fetch(self, owner_id, before=None, limit=20):
+        qs = TimelineEntry.objects.filter(owner_id=owner_id)
+        if before is not None:
+            created_at, post_id = before
+            qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lt=post_id))
+        rows = qs.order_by("-created_at", "-post_id").values_list("created_at", "post_id", "author_id")[:limit]
+        return [TimelineItem(*row) for row in rows]
+
+    def clear(self):
+        TimelineEntry.objects.all().delete()
+
+
+class InMemoryTimelineBackend(BaseTimelineBackend):
+    """
+    Process-local stand-in for a Redis sorted-set timeline store. Each list is
+    kept ascending and trimmed to ``TIMELINE_MAX_LENGTH`` newest items.
+    """
+
+    def __init__(self):
+        self._timelines = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_length(self):
+        return getattr(settings, "TIMELINE_MAX_LENGTH", 800)
+
+    def _insert(self, owner_id, item):
+        timeline = self._timelines.setdefault(owner_id, [])
+        index = bisect.bisect_left(timeline, item)
+        if index < len(timeline) and timeline[index] == item:
+            return
+        timeline.insert(index, item)
+        if len(timeline) > self.max_length:
+            del timeline[: len(timeline) - self.max_length]
+
+    def push(self, owner_ids, item):
+        item = TimelineItem(*item)
+        with self._lock:
+            for owner_id in owner_ids:
+                self._insert(owner_id, item)
+
+    def extend(self, owner_id, items):
+        with self._lock:
+            for item in items:
+                self._insert(owner_id, TimelineItem(*item))
+
+    def remove_author(self, owner_id, author_id):
+        with self._lock:
+            timeline = self._timelines.get(owner_id)
+            if timeline:
+                timeline[:] = [item for item in timeline if item.author_id != author_id]
+
+    def remove_post(self, post_id):
+        with self._lock:
+            for timeline in self._timelines.values():
+                timeline[:] = [item for item in timeline if item.post_id != post_id]
+
+    def fetch(self, owner_id, before=None, limit=20):
+        with self._lock:
+            timeline = self._timelines.get(owner_id, [])
+            # Items compare as tuples, so (created_at, post_id) bounds the slice
+            end = len(timeline) if before is None else bisect.bisect_left(timeline, tuple(before))
+            start = max(end - limit, 0)
+            return list(reversed(timeline[start:end]))
+
+    def clear(self):
+        with self._lock:
+            self._timelines.clear()
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _load_backend(getattr(settings, "TIMELINE_BACKEND", "posts.timeline.DatabaseTimelineBackend"))
+
+
+def is_fanned_out(author):
+    """Authors above the follower threshold are read on demand instead."""
+    return author.followers_count <= fanout_max_followers()
+
+
+def fan_out_post(post):
+    """Push a freshly created post into its author's followers' timelines."""
+    if not is_fanned_out(post.author):
+        return 0
+    follower_ids = list(post.author.followers.values_list("id", flat=True))
+    if follower_ids:
+        get_backend().push(follower_ids, item_for(post))
+    return len(follower_ids)
+
+
+def remove_post(post):
+    get_backend().remove_post(post.pk)
+
+
+def recent_items(author_id, limit=None):
+    rows = (
+        Post.objects.filter(author_id=author_id)
+        .order_by("-created_at", "-id")
+        .values_list("created_at", "id", "author_id")[: limit or backfill_limit()]
+    )
+    return [TimelineItem(*row) for row in rows]
+
+
+def follow(user, author):
+    """Seed ``user``'s timeline with ``author``'s recent posts."""
+    if is_fanned_out(author):
+        get_backend().extend(user.pk, recent_items(author.pk))
+
+
+def unfollow(user, author):
+    get_backend().remove_author(user.pk, author.pk)
+
+
+def pulled_authors(user):
+    """Ids of followed authors whose posts are merged in at read time."""
+    return list(
+        user.following.filter(followers_count__gt=fanout_max_followers()).values_list("id", flat=True)
+    )
+
+
+def read_timeline(user, before=None, limit=20):
+    """
+    Return ``limit`` feed posts for ``user`` newest first and the
+    (created_at, id) position to continue from, or None on the last page.
+    """
+    items = get_backend().fetch(user.pk, before=before, limit=limit + 1)
+
+    pulled = pulled_authors(user)
+    if pulled:
+        qs = Post.objects.filter(author_id__in=pulled)
+        if before is not None:
+            created_at, post_id = before
+            qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+        rows = qs.order_by("-created_at", "-id").values_list("created_at", "id", "author_id")[: limit + 1]
+        merged = {item.post_id: item for item in items}
+        merged.update((row[1], TimelineItem(*row)) for row in rows)
+        items = sorted(merged.values(), reverse=True)[: limit + 1]
+
+    next_position = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_position = (items[-1].created_at, items[-1].post_id)
+    posts = Post.objects.select_related("author").in_bulk([item.post_id for item in items])
+    # Posts deleted since they were fanned out simply drop out of the page
+    return [posts[item.post_id] for item in items if item.post_id in posts], next_position
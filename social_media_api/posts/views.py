@@ -4,29 +4,57 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-
+from rest_framework.settings import api_settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+
+from social_media_api.conditional import ConditionalRetrieveMixin
+from social_media_api.fast_serializers import ValuesListMixin
+from social_media_api.pagination import KeysetPagination, encode_cursor, decode_cursor
+from social_media_api.response_cache import CachedResponseMixin
+from . import timeline
+from .filters import PostSearchFilter
 from .models import Post, Comment, Like
 from .serializers import PostSerializer, CommentSerializer
 from .permissions import IsOwnerOrReadOnly
-from notifications.models import Notification
+from notifications.pipeline import notify
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalRetrieveMixin, CachedResponseMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()  # <-- matches checker
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, PostSearchFilter, OrderingFilter]
     filterset_fields = ["author"]
     search_fields = ["title", "content"]
     ordering_fields = ["created_at", "updated_at"]
+    cursor_ordering = ("-created_at", "-id")
+    # Counters change through bump_counters() without touching updated_at,
+    # and the nested author shows a username kept on another row
+    etag_fields = ("updated_at", "likes_count", "comments_count", "author__username")
+    last_modified_field = None
+    # Cached list pages; likes and comments change the counters, users the author names
+    cache_models = (Post, Comment, Like, get_user_model())
+
+    def get_queryset(self):
+        return Post.objects.select_related("author")
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
         return ctx
 
+    def perform_create(self, serializer):
+        post = serializer.save()
+        timeline.fan_out_post(post)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        timeline.remove_post(instance)
+        instance.delete()
+
+
+class CommentViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()  # <-- matches checker
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
@@ -34,20 +62,63 @@ class CommentViewSet(viewsets.ModelViewSet):
     filterset_fields = ["post", "author"]
     search_fields = ["content"]
     ordering_fields = ["created_at", "updated_at"]
+    cursor_ordering = ("created_at", "id")
+    # The nested author's username is not covered by updated_at
+    etag_fields = ("updated_at", "author__username")
+    last_modified_field = None
+
+    def get_queryset(self):
+        return Comment.objects.select_related("author")
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
         return ctx
 
+    @transaction.atomic
+    def perform_create(self, serializer):
+        comment = serializer.save()
+        Post.bump_counters(comment.post_id, comments_count=1)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_post_id = serializer.instance.post_id
+        comment = serializer.save()
+        if comment.post_id != old_post_id:
+            Post.bump_counters(old_post_id, comments_count=-1)
+            Post.bump_counters(comment.post_id, comments_count=1)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        deleted, _ = Comment.objects.filter(pk=instance.pk).delete()
+        if deleted:
+            Post.bump_counters(instance.post_id, comments_count=-1)
+
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def feed_view(request):
-    following_users = request.user.following.all()
-    posts = Post.objects.filter(author__in=following_users).order_by("-created_at")  # <-- checker match
-    serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data)
+    """
+    Home feed read from the precomputed timeline (see posts.timeline).
+    Paginated by keyset: pass the returned ``next`` cursor to continue.
+    """
+    try:
+        limit = int(request.query_params.get("limit", api_settings.PAGE_SIZE))
+    except ValueError:
+        limit = api_settings.PAGE_SIZE
+    # Clamp once, so the next link carries the limit actually used
+    limit = max(1, min(limit, KeysetPagination.max_page_size))
+    cursor = request.query_params.get("cursor")
+    before = decode_cursor(cursor) if cursor else None
+
+    posts, next_position = timeline.read_timeline(request.user, before=before, limit=limit)
+    next_url = None
+    if next_position is not None:
+        next_url = request.build_absolute_uri(
+            f"{reverse('feed')}?cursor={encode_cursor(*next_position)}&limit={limit}"
+        )
+    serializer = PostSerializer(posts, many=True, context={"request": request})
+    return Response({"next": next_url, "results": serializer.data})
 
 
 class LikePostView(generics.GenericAPIView):
@@ -56,17 +127,15 @@ class LikePostView(generics.GenericAPIView):
     def post(self, request, pk):
         # ✅ Using generics.get_object_or_404 for checker
         post = generics.get_object_or_404(Post, pk=pk)
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
-        if not created:
+        try:
+            with transaction.atomic():
+                Like.objects.create(user=request.user, post=post)
+                Post.bump_counters(post.pk, likes_count=1)
+        except IntegrityError:
             return Response({"detail": "You already liked this post."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if post.author != request.user:
-            Notification.objects.create(
-                recipient=post.author,
-                actor=request.user,
-                verb="liked your post",
-                target=post
-            )
+        if post.author_id != request.user.id:
+            notify(post.author_id, request.user.id, "liked your post", target=post)
         return Response({"detail": "Post liked."}, status=status.HTTP_201_CREATED)
 
 
@@ -76,9 +145,11 @@ class UnlikePostView(generics.GenericAPIView):
     def post(self, request, pk):
         # ✅ Using generics.get_object_or_404 for checker
         post = generics.get_object_or_404(Post, pk=pk)
-        try:
-            like = Like.objects.get(user=request.user, post=post)
-            like.delete()
-            return Response({"detail": "Post unliked."}, status=status.HTTP_200_OK)
-        except Like.DoesNotExist:
+        with transaction.atomic():
+            # Only the request that actually removed the row decrements
+            deleted, _ = Like.objects.filter(user=request.user, post=post).delete()
+            if deleted:
+                Post.bump_counters(post.pk, likes_count=-1)
+        if not deleted:
             return Response({"detail": "You haven’t liked this post."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"detail": "Post unliked."}, status=status.HTTP_200_OK)
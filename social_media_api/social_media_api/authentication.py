@@ -0,0 +1,65 @@
+"""
+Token authentication with a cache in front of the token table.
+
+``CachedTokenAuthentication`` is a drop-in replacement for DRF's
+``TokenAuthentication``. A validated ``(user, token)`` pair is kept in the
+"tokens" cache (see CACHES in settings), so warm requests authenticate
+without a query. That alias's TIMEOUT and MAX_ENTRIES bound how long and
+how many tokens are kept.
+
+Entries are dropped when a token is saved or deleted and whenever its
+user is saved. With the default per-process LocMemCache that only reaches
+the worker that handled the save: other workers keep accepting a rotated
+token or a deactivated user until their entry times out. Point the alias
+at a shared backend (e.g. Redis) to make revocation reach every worker.
+Bulk ``update()`` calls bypass signals and are only covered by the timeout.
+
+The cached user is a read-only snapshot: columns maintained with
+``queryset.update()``, such as the follow counters, may lag behind by up
+to the timeout. Views that save the user or show those columns re-read it
+(see ``accounts.views.ProfileView``) instead of using ``request.user``.
+Hit and miss counts are kept in ``stats``.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+stats = Counter()
+
+
+def token_cache():
+    return caches["tokens"]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        entry = cache.get(f"token:{key}")
+        stats["hits" if entry is not None else "misses"] += 1
+        if entry is None:
+            # Raises AuthenticationFailed for unknown keys and inactive users
+            entry = super().authenticate_credentials(key)
+            user, token = entry
+            cache.set_many({f"token:{key}": entry, f"user:{user.pk}": key})
+        # The cache hands back an unpickled copy, so requests never share a user
+        return entry
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache().delete_many([f"token:{instance.key}", f"user:{instance.user_id}"])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_user_token(sender, instance, **kwargs):
+    cache = token_cache()
+    key = cache.get(f"user:{instance.pk}")
+    if key is not None:
+        cache.delete_many([f"token:{key}", f"user:{instance.pk}"])
@@ -0,0 +1,59 @@
+"""
+Conditional GET (ETag / Last-Modified) for DRF retrieve endpoints.
+
+Validators come from a ``values_list()`` of a few version columns, so a
+client revalidating an unchanged object gets its 304 without the object
+being loaded or serialized. Those columns must cover everything the
+payload shows, including nested objects (e.g. ``author__username``), or a
+change to them is answered with a stale 304. Only the detail lookup is used, not the list
+filters; object-level permissions are checked on full responses only,
+which is fine for objects any permitted reader may see.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+class ConditionalRetrieveMixin:
+    # Columns whose values change whenever the serialized object does
+    etag_fields = ("updated_at",)
+    # Emit Last-Modified from this column; None when etag_fields cover more
+    # than the timestamp (e.g. counters updated without touching it)
+    last_modified_field = "updated_at"
+
+    def get_validators(self):
+        """``(etag, last_modified timestamp or None)``, or None when the object does not exist."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        fields = list(dict.fromkeys([*self.etag_fields, *filter(None, [self.last_modified_field])]))
+        try:
+            row = (
+                self.get_queryset()
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list(*fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            row = None  # malformed lookup; retrieve() answers it with a 404
+        if row is None:
+            return None
+        values = dict(zip(fields, row))
+        # The same row renders differently per format (JSON vs browsable API)
+        version = repr([self.request.accepted_renderer.format, *(values[f] for f in self.etag_fields)])
+        etag = quote_etag(hashlib.md5(version.encode()).hexdigest())
+        last_modified = values[self.last_modified_field] if self.last_modified_field else None
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        return response
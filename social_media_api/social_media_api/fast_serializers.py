@@ -0,0 +1,112 @@
+"""
+Read-only fast path for list endpoints: rows from ``.values()`` instead of
+model instances.
+
+A ModelSerializer pays for every row twice: once to build a model instance
+and once per field in to_representation(). ``ValuesSerializerMixin`` walks
+the serializer's fields once per request to learn which ORM lookup feeds
+each one. After that every row is a plain dict lookup. Only fields whose
+representation differs from the raw value (dates, decimals...) still go
+through ``field.to_representation()``. Nested serializers (``many=False``,
+over a non-null relation) become lookups through it, e.g. ``author__username``.
+
+Fields that are not a column (model properties, SerializerMethodFields,
+generic relations) are listed in ``values_computed``. They are filled in
+by ``values_<name>(row)``, which can read the extra lookups listed in
+``values_extra_lookups``. ``prepare_values(rows)`` runs once per page first,
+so those methods can share a batched query.
+
+``ValuesListMixin`` swaps a view's list() over to this path. The output
+must match the regular serializer's; the tests compare the two.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Fields whose representation of a non-None column value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializerMixin:
+    # Fields filled in by values_<name>(row) instead of read from a lookup
+    values_computed = ()
+    # Extra .values() lookups the values_<name>() methods read
+    values_extra_lookups = ()
+
+    def _values_plan(self, serializer, prefix=""):
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if serializer is self and name in self.values_computed:
+                plan.append((name, None, getattr(self, f"values_{name}")))
+                continue
+            if isinstance(field, serializers.BaseSerializer) and not getattr(field, "many", False):
+                plan.append((name, None, self._values_plan(field, prefix + "__".join(field.source_attrs) + "__")))
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)) or field.source == "*":
+                raise ImproperlyConfigured(
+                    f"{type(self).__name__}.{name} has no column to read; list it in values_computed."
+                )
+            convert = None if isinstance(field, PASSTHROUGH_FIELDS) else field.to_representation
+            plan.append((name, prefix + "__".join(field.source_attrs), convert))
+        return plan
+
+    @property
+    def values_plan(self):
+        """``[(name, lookup, convert)]``; a nested plan takes the place of ``convert`` for nested serializers."""
+        if not hasattr(self, "_values_plan_cache"):
+            self._values_plan_cache = self._values_plan(self)
+        return self._values_plan_cache
+
+    def values_lookups(self):
+        lookups = list(self.values_extra_lookups)
+
+        def collect(plan):
+            for _, lookup, convert in plan:
+                if lookup is not None:
+                    lookups.append(lookup)
+                elif isinstance(convert, list):
+                    collect(convert)
+
+        collect(self.values_plan)
+        return list(dict.fromkeys(lookups))
+
+    def prepare_values(self, rows):
+        """Hook run once per page before values_<name>() methods are called."""
+
+    def _build(self, plan, row):
+        data = {}
+        for name, lookup, convert in plan:
+            if lookup is None:
+                data[name] = self._build(convert, row) if isinstance(convert, list) else convert(row)
+                continue
+            value = row[lookup]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def values_representation(self, rows):
+        """Representations of ``.values(*self.values_lookups())`` rows."""
+        rows = list(rows)
+        self.prepare_values(rows)
+        plan = self.values_plan
+        return [self._build(plan, row) for row in rows]
+
+
+class ValuesListMixin:
+    """list() through the serializer's ValuesSerializerMixin fast path."""
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Prefetches need model instances; the fast path batches its own lookups
+        rows = queryset.prefetch_related(None).values(*serializer.values_lookups())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.values_representation(page))
+        return Response(serializer.values_representation(rows))
@@ -0,0 +1,109 @@
+"""
+Pagination shared by the posts and notifications APIs.
+
+List endpoints keep the classic ``?page=N`` responses by default. Clients
+that pass ``?cursor=...`` or ``?count=false`` get keyset pagination
+instead: pages are fetched with ``WHERE (ts, id) < (last_ts, last_id)``
+on a composite index, so there is no ``COUNT(*)`` and no deep ``OFFSET``.
+"""
+import base64
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(created_at, pk):
+    """Encode a (timestamp, id) keyset position as an opaque URL-safe token."""
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises NotFound for malformed tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise NotFound("Invalid cursor.")
+
+
+def keyset_filter(field, position, descending=True):
+    """Rows strictly after ``position`` in (field, id) order."""
+    value, pk = position
+    op = "lt" if descending else "gt"
+    return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+
+
+class PageOrCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    Views declare their keyset order as ``cursor_ordering``, a
+    (timestamp_field, id) pair such as ``("-created_at", "-id")``. In keyset
+    mode any ``?ordering=`` from OrderingFilter is superseded by it.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    default_cursor_ordering = ("-created_at", "-id")
+
+    def use_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.count_query_param, "").lower() in ("false", "0")
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        ordering = getattr(view, "cursor_ordering", self.default_cursor_ordering)
+        self.field = ordering[0].lstrip("-")
+        self.descending = ordering[0].startswith("-")
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*ordering)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(keyset_filter(self.field, decode_cursor(token), self.descending))
+
+        results = list(queryset[: page_size + 1])
+        self.next_position = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            last = results[-1]
+            if isinstance(last, dict):  # .values() rows (social_media_api.fast_serializers)
+                self.next_position = (last[self.field], last["id"])
+            else:
+                self.next_position = (getattr(last, self.field), last.pk)
+        return results
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(*self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.get_next_cursor_link()),
+            ("results", data),
+        ]))
+
+
+class KeysetPagination(PageOrCursorPagination):
+    """Always-keyset variant for endpoints that never need page numbers."""
+
+    def use_cursor(self, request):
+        return True
@@ -0,0 +1,51 @@
+"""
+Faster renderers for DRF responses.
+
+``ORJSONRenderer`` produces the same compact UTF-8 JSON as DRF's
+JSONRenderer, encoded by orjson. Types orjson does not know natively
+(Decimal, lazy strings, ...) go through DRF's JSONEncoder. When orjson is
+not installed it falls back to JSONRenderer.
+
+``MessagePackRenderer`` answers ``Accept: application/msgpack``. It needs
+the ``msgpack`` package and is only listed in DEFAULT_RENDERER_CLASSES
+when that package is installed (see settings).
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        option = orjson.OPT_NON_STR_KEYS
+        # orjson only indents by two; any ?indent= asks for readable output
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_encoder.default, option=option)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
@@ -0,0 +1,122 @@
+"""
+Response caching for DRF list endpoints (PostViewSet.list).
+
+CachedResponseMixin stores the rendered bytes of successful ``list``
+responses, keyed by URL (path and sorted query parameters),
+auth scope (anonymous, or the user), renderer format and one generation
+counter per model in ``cache_models``.
+
+A post_save or post_delete of any of those models bumps its counter, so
+every key built from the old value stops being read and then expires.
+The app owning the view connects them with ``invalidate_on_change()`` in
+its ``ready()``, so writes from the shell or a worker bump them too.
+Writes that send no signals (bulk_create(), queryset.update()) must call
+``bump()`` themselves.
+
+Authentication, permissions and throttling still run on every request;
+only the queryset and serializer work is skipped. Responses carry an
+``X-Cache: HIT`` or ``X-Cache: MISS`` header.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+
+GENERATION_PREFIX = "drf:gen:"
+RESPONSE_PREFIX = "drf:response:"
+
+
+def get_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", None) or "default"]
+
+
+def cache_timeout():
+    """Seconds a response stays cached; 0 turns the cache off."""
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+
+
+def generation_key(model):
+    return f"{GENERATION_PREFIX}{model._meta.label_lower}"
+
+
+def generations(models):
+    cache = get_cache()
+    keys = [generation_key(model) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # A counter that was never set (or was evicted) starts from a value
+            # no earlier key can have used
+            found[key] = cache.get_or_set(key, time.time_ns(), timeout=None)
+    return [found[key] for key in keys]
+
+
+def bump(*models):
+    cache = get_cache()
+    for model in models:
+        key = generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def _bump_sender(sender, **kwargs):
+    bump(sender)
+    # A request that ran before the commit may have cached the old rows under
+    # the new generation; bump again once the write is visible
+    transaction.on_commit(lambda: bump(sender))
+
+
+def invalidate_on_change(*models):
+    for model in models:
+        uid = f"response-cache:{model._meta.label_lower}"
+        post_save.connect(_bump_sender, sender=model, dispatch_uid=uid)
+        post_delete.connect(_bump_sender, sender=model, dispatch_uid=uid)
+
+
+class CachedResponseMixin:
+    # Models whose writes change the cached output; pass them to
+    # invalidate_on_change() in the app's ready()
+    cache_models = ()
+
+    def get_cache_scope(self, request):
+        user = request.user
+        return f"user:{user.pk}" if user and user.is_authenticated else "anon"
+
+    def response_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        version = repr([
+            request.build_absolute_uri(request.path),
+            params,
+            self.get_cache_scope(request),
+            request.accepted_renderer.format,
+            generations(self.cache_models),
+        ])
+        return RESPONSE_PREFIX + hashlib.md5(version.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        timeout = cache_timeout()
+        if timeout <= 0:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.response_cache_key(request)
+        hit = cache.get(key)
+        if hit is not None:
+            status, content_type, content = hit
+            response = HttpResponse(content, content_type=content_type, status=status)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda r: cache.set(key, (r.status_code, r["Content-Type"], r.content), timeout)
+            )
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 # ---------------- Deployment Port ---------------- #
 import os
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
     
     'django_filters',   # for filtering
     'posts',    
+    'notifications',
 ]
 
 MIDDLEWARE = [
@@ -96,6 +98,26 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'social-media-api',
+    },
+    # Validated API tokens (social_media_api/authentication.py). TIMEOUT is
+    # how long a token stays cached; swap in a shared backend (e.g. Redis)
+    # so revoking a token reaches every process
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -115,6 +137,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing profile. "fast" swaps PBKDF2 for MD5 so test and
+# benchmark runs are not dominated by hashing; never use it in production.
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "default")
+
+if PASSWORD_HASHER_PROFILE == "fast":
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -145,12 +177,14 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # TokenAuthentication with a cache in front of the token table
+        "social_media_api.authentication.CachedTokenAuthentication",
     ]
 }
 
 REST_FRAMEWORK.update({
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # Page numbers by default; ?cursor= / ?count=false switch to keyset pages
+    "DEFAULT_PAGINATION_CLASS": "social_media_api.pagination.PageOrCursorPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -159,6 +193,62 @@ REST_FRAMEWORK.update({
     ],
 })
 
+# ---------------- Rendering ---------------- #
+
+# orjson-backed JSON first (social_media_api.renderers); MessagePack for
+# "Accept: application/msgpack" when the msgpack package is installed
+REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+    "social_media_api.renderers.ORJSONRenderer",
+    *(["social_media_api.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+    "rest_framework.renderers.BrowsableAPIRenderer",
+]
+
+
+# ---------------- Home Timeline ---------------- #
+
+# Storage for precomputed feeds (posts.timeline)
+TIMELINE_BACKEND = "posts.timeline.DatabaseTimelineBackend"
+
+# Authors above this many followers are merged into feeds at read time
+TIMELINE_FANOUT_MAX_FOLLOWERS = 5000
+
+# Recent posts copied into a timeline when a follow edge is added
+TIMELINE_BACKFILL_LIMIT = 200
+
+
+# ---------------- Post Search ---------------- #
+
+# Full-text backend for ?search= on posts (posts.search); None picks
+# SQLite FTS5 or PostgreSQL tsvector from the database vendor
+POST_SEARCH_BACKEND = None
+
+
+# ---------------- Response Cache ---------------- #
+
+# Seconds a rendered list response stays cached (social_media_api.response_cache);
+# writes invalidate it sooner through model signals. 0 turns it off
+RESPONSE_CACHE_TIMEOUT = 60
+
+# CACHES alias for cached responses; None uses "default"
+RESPONSE_CACHE_ALIAS = None
+
+
+# ---------------- Notifications ---------------- #
+
+# Delivery backend for notifications.pipeline.notify()
+NOTIFICATION_BACKEND = "notifications.pipeline.ThreadedQueueBackend"
+
+# Repeated (recipient, verb, target) events within this many seconds share a row
+NOTIFICATION_COALESCE_WINDOW = 3600
+
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATION_FLUSH_INTERVAL = 0.5
+
+# Unread badge counts (notifications.unread). Point the alias at a shared
+# cache (e.g. Redis) with several workers; the timeout bounds how stale a
+# per-process cache can get
+NOTIFICATION_UNREAD_CACHE_ALIAS = None
+NOTIFICATION_UNREAD_TIMEOUT = 60
 
 
 # ---------------- Security Settings ---------------- #